@@ -3,24 +3,43 @@
 -- ====================================================================
 --
 -- This script creates the `logs` table used by the `mysql_logger.py` module.
--- You can run this script manually against your target database.
+-- `init_db()` runs this same file on startup, after reading `schema_version`
+-- and migrating a legacy (version 1, unindexed) `logs` table in place. You can
+-- also run it manually against your target database.
+--
+-- Schema version 2:
+--   * `run_id` column so a single agent run can be read back by index.
+--   * Composite indexes on (timestamp, level), (source, timestamp) and (run_id, timestamp).
+--   * RANGE COLUMNS partitioning on `timestamp`. `apply_log_retention()` splits
+--     `pmax` into daily partitions and drops the ones older than LOG_RETENTION_DAYS.
 --
 
--- Drop the table if it exists (optional, for a clean slate)
--- DROP TABLE IF EXISTS `logs`;
+-- Tracks which schema version has been applied; keep the inserted version in
+-- step with SCHEMA_VERSION in mysql_logger.py.
+CREATE TABLE IF NOT EXISTS `schema_version` (
+    `version` INT NOT NULL PRIMARY KEY COMMENT 'Applied schema version',
+    `applied_at` DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP COMMENT 'When the version was applied'
+);
 
 -- Create the `logs` table
+-- The partitioning column must be part of every unique key, hence the (id, timestamp) primary key.
 CREATE TABLE IF NOT EXISTS `logs` (
-    `id` INT AUTO_INCREMENT PRIMARY KEY COMMENT 'Unique identifier for each log entry',
+    `id` BIGINT NOT NULL AUTO_INCREMENT COMMENT 'Unique identifier for each log entry',
     `timestamp` DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP COMMENT 'Timestamp of the log entry',
+    `run_id` CHAR(32) DEFAULT NULL COMMENT 'Agent run that produced the entry',
     `level` VARCHAR(20) NOT NULL COMMENT 'Log level (e.g., INFO, ERROR, DEBUG)',
     `source` VARCHAR(255) NOT NULL COMMENT 'Source of the log (e.g., rss_feed, mcp_client_agent)',
     `message` TEXT NOT NULL COMMENT 'The main log message',
     `details` JSON DEFAULT NULL COMMENT 'A JSON object for additional structured data',
+    PRIMARY KEY (`id`, `timestamp`),
+
+    -- Indexes for faster querying
+    INDEX `idx_timestamp_level` (`timestamp`, `level`),
+    INDEX `idx_source_timestamp` (`source`, `timestamp`),
+    INDEX `idx_run_id_timestamp` (`run_id`, `timestamp`)
 )
+PARTITION BY RANGE COLUMNS (`timestamp`) (
+    PARTITION `pmax` VALUES LESS THAN (MAXVALUE)
+);
 
-    
-    -- -- Indexes for faster querying
-    -- INDEX `idx_timestamp` (`timestamp`),
-    -- INDEX `idx_level` (`level`),
-    -- INDEX `idx_source` (`source`)
+INSERT IGNORE INTO `schema_version` (`version`) VALUES (2);
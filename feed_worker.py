@@ -0,0 +1,244 @@
+# The agent side of the feed: runs the agent on a schedule and publishes the feed and
+# metrics snapshot. Imported only by the `dev` and `worker` modes of rss_feed.py, so the
+# `serve` web workers never load the agent, its caches, the log writer or this loop.
+import asyncio
+import json
+import os
+import sys
+import time
+import uuid
+from datetime import datetime
+
+import pytz
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from feedgen.feed import FeedGenerator
+
+from linkedin_agent.mcp_client_agent import run_agent, get_runtime
+from linkedin_agent.utils import feed_files, feed_store, metrics, tracing
+from linkedin_agent.utils.event_loop import BackgroundLoop
+from linkedin_agent.utils.mysql_logger import init_db, log, apply_log_retention, shutdown_logger
+
+FEED_URL = 'http://localhost:5000/rss'
+# Derived from the feed URL so the feed keeps its ID across generations
+FEED_ID = 'urn:uuid:' + str(uuid.uuid5(uuid.NAMESPACE_URL, FEED_URL))
+
+# Streaming mode: cards are merged into the feed as each analysis completes, and the
+# feed is republished at most every FEED_STREAM_PUBLISH_SECONDS while the run goes on
+FEED_STREAMING = os.getenv("FEED_STREAMING", "false").lower() == "true"
+FEED_STREAM_PUBLISH_SECONDS = float(os.getenv("FEED_STREAM_PUBLISH_SECONDS", "30"))
+
+# One long-lived event loop for every scheduled coroutine, so async
+# connection pools, caches and the MCP runtime survive between runs.
+background_loop = BackgroundLoop()
+_feed_update_running = False
+
+
+async def pre_run_checks() -> bool:
+    """
+    Performs pre-run checks for essential services like the database and MCP server.
+    Returns False if a check fails so the caller can exit the application.
+    """
+    print("--- Performing pre-run connectivity checks ---")
+    
+    # 1. Check SQL DB connection
+    try:
+        print("Checking database connection...")
+        init_db()  # This will implicitly check the connection by initializing
+        print("Database connection successful.")
+        log('INFO', 'PreRunCheck', 'Database connection successful.')
+    except Exception as e:
+        print(f"FATAL: Database connection failed: {e}", file=sys.stderr)
+        # We can't log to DB if it's down, so we just print and exit.
+        return False
+
+    # 2. Check MCP Server connection
+    try:
+        print("Checking MCP server connection...")
+        # The shared runtime keeps this client warm for the scheduled runs
+        if not await get_runtime().health_check():
+            raise ConnectionError("MCP server is unreachable.")
+        print("MCP server connection successful.")
+        log('INFO', 'PreRunCheck', 'MCP server connection successful.')
+    except Exception as e:
+        print(f"FATAL: MCP server connection failed: {e}", file=sys.stderr)
+        log('CRITICAL', 'PreRunCheck', 'MCP server connection failed.', {'error': str(e)})
+        return False
+        
+    print("--- All connectivity checks passed ---")
+    return True
+
+
+def _utc(timestamp: float) -> datetime:
+    return datetime.fromtimestamp(timestamp, tz=pytz.UTC)
+
+
+def write_feed(extra_entries: list = ()) -> dict:
+    """
+    Renders the rolling window of the feed entry store to the published feed file. Entry
+    IDs and timestamps come from the store, so an unchanged store renders identical bytes.
+    """
+    entries = list(extra_entries) + feed_store.recent_entries()
+    fg = FeedGenerator()
+    fg.id(FEED_ID)
+    fg.title('LinkedIn Job Analysis RSS Feed')
+    fg.link(href=FEED_URL, rel='self')
+    fg.description('An RSS feed of job analysis from the LinkedIn agent.')
+    fg.logo('http://localhost:5000/fluff/logo.png')
+    # An empty feed is stamped with the current time rather than the epoch
+    fg.updated(_utc(max((entry['updated'] for entry in entries), default=time.time())))
+
+    for entry in entries:
+        fe = fg.add_entry(order='append')
+        fe.id(entry['id'])
+        fe.title(entry['job_title'] or 'Unknown Job Title')
+        fe.link(href=entry['link'] or FEED_URL)
+        fe.description(entry['job_html'] or '<p>No content available.</p>')
+        fe.published(_utc(entry['published']))
+        fe.updated(_utc(entry['updated']))
+
+    # Written atomically, with its compressed variants, ETag and Last-Modified
+    return feed_files.publish_feed(feed_files.RSS_FILE, fg.atom_str(pretty=True))
+
+
+class FeedSink:
+    """
+    Receives cards streamed by the agent, merges each into the feed entry store right
+    away and republishes the feed at most every FEED_STREAM_PUBLISH_SECONDS.
+    """
+
+    def __init__(self, publish_seconds: float = None):
+        self.publish_seconds = FEED_STREAM_PUBLISH_SECONDS if publish_seconds is None else publish_seconds
+        self.counts = {"added": 0, "updated": 0, "unchanged": 0, "expired": 0}
+        self.started = time.monotonic()
+        self.first_card_seconds = None
+        self._published_at = None
+
+    def __call__(self, card: dict):
+        for key, value in feed_store.merge_entries([card]).items():
+            self.counts[key] += value
+        if self.first_card_seconds is None:
+            self.first_card_seconds = time.monotonic() - self.started
+            log('INFO', 'RSS_Feed', 'First card streamed into the feed.', {'seconds': round(self.first_card_seconds, 2)})
+        if self._published_at is None or time.monotonic() - self._published_at >= self.publish_seconds:
+            write_feed()
+            self._published_at = time.monotonic()
+
+
+async def update_rss_feed():
+    """
+    Runs the agent, merges its analyses into the feed entry store and rewrites the feed.
+    """
+    print("--- Updating RSS Feed ---")
+    try:
+        # The whole update is one traced run; run_agent records its spans inside it
+        with tracing.run_trace("update_rss_feed"):
+            log('INFO', 'RSS_Feed', 'Starting RSS feed update.')
+            # Run the agent to get the latest analysis; in streaming mode cards reach the feed as they complete
+            sink = FeedSink() if FEED_STREAMING else None
+            analysis_content = await run_agent(on_card=sink)
+            log('INFO', 'RSS_Feed', 'Agent run completed.', {'content_length': len(analysis_content)})
+
+            with tracing.span("feed.generate") as feed_span:
+                # Merge the analyzed jobs into the rolling entry store
+                error_entries = []
+                try:
+                    jobs = json.loads(analysis_content)
+
+                    if not isinstance(jobs, list):
+                        raise TypeError("Expected a list of jobs from agent")
+
+                    counts = feed_store.merge_entries([job for job in jobs if isinstance(job, dict)])
+                    if sink is not None:
+                        counts = {key: value + sink.counts[key] for key, value in counts.items()}
+                        feed_span.set(first_card_ms=round((sink.first_card_seconds or 0) * 1000))
+                    feed_span.set(**counts)
+                    log('INFO', 'RSS_Feed', 'Merged agent output into the feed entry store.', counts)
+
+                except (json.JSONDecodeError, TypeError) as e:
+                    log('ERROR', 'RSS_Feed', 'Error processing job analysis.', {'error': str(e), 'raw_output': analysis_content})
+                    # If parsing fails or the structure is wrong, show a single error entry in this generation only
+                    now = time.time()
+                    error_entries.append({
+                        "id": 'urn:uuid:' + str(uuid.uuid4()),
+                        "job_title": f'Error Processing Job Analysis: {type(e).__name__}',
+                        "job_html": f"Could not process agent output. Error: {e}\n\nRaw output:\n{analysis_content}",
+                        "link": None,
+                        "published": now,
+                        "updated": now,
+                    })
+
+                feed_meta = write_feed(error_entries)
+                feed_span.set(bytes=feed_meta['sizes']['identity'])
+                print(f"--- RSS Feed updated and saved to {feed_files.RSS_FILE} ---")
+                log('INFO', 'RSS_Feed', f'RSS Feed updated and saved to {feed_files.RSS_FILE}.')
+
+    except asyncio.CancelledError:
+        log('WARNING', 'RSS_Feed', 'RSS feed update was cancelled.')
+        raise
+    except Exception as e:
+        print(f"Error updating RSS feed: {e}")
+        log('ERROR', 'RSS_Feed', 'Error updating RSS feed.', {'error': str(e)})
+
+
+async def scheduled_feed_update():
+    """Runs update_rss_feed unless a previous run is still in progress."""
+    global _feed_update_running
+    if _feed_update_running:
+        log('WARNING', 'RSS_Feed', 'Skipping scheduled update, the previous run is still in progress.')
+        return
+    _feed_update_running = True
+    try:
+        await update_rss_feed()
+    finally:
+        _feed_update_running = False
+
+
+def start_scheduler(snapshot_metrics: bool = False):
+    """
+    Runs the pre-run checks on the background loop and schedules the feed update and
+    log maintenance there. Returns the scheduler, or None if a check failed.
+    """
+    # The checks run on the long-lived loop so the MCP runtime they warm up is reused
+    background_loop.start()
+    if not background_loop.run(pre_run_checks()):
+        background_loop.stop()
+        return None
+
+    # Jobs are coroutines executed on the background loop
+    scheduler = AsyncIOScheduler(event_loop=background_loop.loop)
+    # Schedule the RSS feed update to run every 72 hours, starting now to generate the feed immediately.
+    # max_instances/coalesce keep a slow run from overlapping with the next one.
+    scheduler.add_job(
+        scheduled_feed_update,
+        'interval',
+        hours=72,
+        jitter=36000,
+        next_run_time=datetime.now(),
+        max_instances=1,
+        coalesce=True
+    )
+    # Roll the log partitions every day at midnight: add upcoming days, drop expired ones
+    scheduler.add_job(
+        apply_log_retention,
+        'cron',
+        hour=0
+    )
+    if snapshot_metrics:
+        # The web processes serve this file on /metrics, since the agent does not run there
+        scheduler.add_job(
+            metrics.write_snapshot,
+            'interval',
+            seconds=metrics.SNAPSHOT_SECONDS,
+            args=[metrics.SNAPSHOT_PATH],
+            next_run_time=datetime.now()
+        )
+    background_loop.call_soon(scheduler.start)
+    apply_log_retention()
+    return scheduler
+
+
+def stop_scheduler(scheduler):
+    """Stops the scheduled jobs, the background loop and the log writer."""
+    background_loop.call_soon(scheduler.shutdown, False)
+    background_loop.stop()
+    shutdown_logger()
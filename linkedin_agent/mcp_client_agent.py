@@ -1,14 +1,20 @@
 import asyncio
 import json
+import math
 import sys
+from langgraph.config import get_config, get_stream_writer
 from langgraph.graph import StateGraph, MessagesState, START, END
 from langgraph.prebuilt import ToolNode
 from langchain_core.messages import ToolMessage
 from langchain_mcp_adapters.client import MultiServerMCPClient
+from langchain_mcp_adapters.tools import load_mcp_tools
 from langchain.chat_models import init_chat_model
 from langchain_core.messages import AIMessage
 from datetime import datetime
+from functools import lru_cache
 import random
+import time
+from collections import Counter
 
 from linkedin_agent.prompts import prompts
 from linkedin_agent.tools.tavily_search_tools import search_company
@@ -24,8 +30,18 @@ from linkedin_agent.tools import append_to_wiki_page
 from dotenv import load_dotenv
 import os
 
+from linkedin_agent.utils import job_index, metrics, prompt_inputs, tracing
+from linkedin_agent.utils.adaptive_scheduler import AdaptiveScheduler
+from linkedin_agent.utils.local_store import SqliteCache, make_key
 from linkedin_agent.utils.mysql_logger import init_db, log
-from linkedin_agent.utils.render_html import render_job_card
+from linkedin_agent.utils.analysis_schema import (
+    JobAnalysis,
+    dump_analysis,
+    extract_json,
+    parse_analysis,
+    validate_analysis,
+)
+from linkedin_agent.utils.render_html import render_analysis, render_error_card
 
 # Load environment variables from .env file
 load_dotenv()
@@ -42,6 +58,57 @@ PROJECT = os.getenv("PROJECT")
 WIKI_ID = os.getenv("WIKI_ID")
 PAGE_PATH = os.getenv("PAGE_PATH")
 
+# Analysis Cache Configuration
+# Bump ANALYSIS_CACHE_VERSION to invalidate every cached model response.
+ANALYSIS_CACHE_VERSION = os.getenv("ANALYSIS_CACHE_VERSION", "1")
+ANALYSIS_CACHE_TTL_DAYS = float(os.getenv("ANALYSIS_CACHE_TTL_DAYS", "30"))
+ANALYSIS_CACHE_MAX_ENTRIES = int(os.getenv("ANALYSIS_CACHE_MAX_ENTRIES", "2000"))
+
+analysis_cache = SqliteCache(
+    "analysis",
+    ttl_seconds=ANALYSIS_CACHE_TTL_DAYS * 86400,
+    max_entries=ANALYSIS_CACHE_MAX_ENTRIES,
+)
+
+# Hit ratios of every local cache (analysis, company, ...) are read when /metrics is scraped.
+metrics.CACHE_HIT_RATIO.set_function(lambda: {
+    (namespace,): cache.stats()["hit_ratio"] for namespace, cache in SqliteCache.instances.items()
+})
+metrics.CACHE_LOOKUPS.set_function(lambda: {
+    (namespace, result): cache.stats()[result]
+    for namespace, cache in SqliteCache.instances.items()
+    for result in ("hits", "negative_hits", "misses")
+})
+
+# Analysis Fan-out Configuration
+ANALYSIS_INITIAL_CONCURRENCY = int(os.getenv("ANALYSIS_INITIAL_CONCURRENCY", "4"))
+ANALYSIS_MAX_CONCURRENCY = int(os.getenv("ANALYSIS_MAX_CONCURRENCY", "16"))
+ANALYSIS_MAX_RETRIES = int(os.getenv("ANALYSIS_MAX_RETRIES", "4"))
+ANALYSIS_TIMEOUT = float(os.getenv("ANALYSIS_TIMEOUT", "120"))
+# Number of jobs packed into one model request; 1 keeps the per-job prompt.
+ANALYSIS_BATCH_SIZE = int(os.getenv("ANALYSIS_BATCH_SIZE", "1"))
+# "prompt" asks for JSON in the prompt text; "structured" binds the JobAnalysis schema to the
+# model's native structured output (batching is not used in this mode).
+ANALYSIS_MODE = os.getenv("ANALYSIS_MODE", "prompt").lower()
+# with_structured_output method: "json_schema", "function_calling" or "json_mode".
+ANALYSIS_STRUCTURED_METHOD = os.getenv("ANALYSIS_STRUCTURED_METHOD", "json_schema")
+# Send the first analysis request of a run on its own, so the provider has cached the shared
+# prompt prefix (rules, schema, profile) before the rest fan out.
+ANALYSIS_PREFIX_WARMUP = os.getenv("ANALYSIS_PREFIX_WARMUP", "true").lower() == "true"
+
+# Search Configuration
+# "direct" calls search_jobs without the tool-calling model; "agent" runs the full LangGraph agent.
+RUN_MODE = os.getenv("RUN_MODE", "direct").lower()
+# Number of queries from prompts.jobs_query searched per run.
+RUN_QUERY_BUDGET = int(os.getenv("RUN_QUERY_BUDGET", "1"))
+# Maximum number of results kept from each query (0 keeps all).
+QUERY_RESULT_CAP = int(os.getenv("QUERY_RESULT_CAP", "25"))
+SEARCH_CONCURRENCY = int(os.getenv("SEARCH_CONCURRENCY", "3"))
+# Name of the search term argument of the MCP search_jobs tool.
+SEARCH_JOBS_QUERY_ARG = os.getenv("SEARCH_JOBS_QUERY_ARG", "search_term")
+# Additional arguments passed to every search_jobs call, as a JSON object.
+SEARCH_JOBS_EXTRA_ARGS = json.loads(os.getenv("SEARCH_JOBS_EXTRA_ARGS") or "{}")
+
 def create_mcp_client():
     """Initializes and returns the MultiServerMCPClient."""
     return MultiServerMCPClient({
@@ -52,17 +119,23 @@ def create_mcp_client():
     })
 
 
-async def setup_tools_and_model(client, model):
-    """Fetches tool configurations, sets up tools, and binds them to the model."""
+@lru_cache(maxsize=1)
+def load_unrestricted_tool_names() -> frozenset:
+    """Reads the tool configuration file once and returns the names of unrestricted tools."""
     with open(TOOL_CONFIG_PATH, 'r') as f:
         tool_config = json.load(f)
 
-    unrestricted_tool_names = {
+    return frozenset(
         tool['name']
         for tool_group in tool_config.values()
         for tool in tool_group
         if not tool.get('restricted', False)
-    }
+    )
+
+
+async def setup_tools_and_model(client, model):
+    """Fetches tool configurations, sets up tools, and binds them to the model."""
+    unrestricted_tool_names = load_unrestricted_tool_names()
 
     client_tools = await client.get_tools()
     tools = [tool for tool in client_tools if tool.name in unrestricted_tool_names]
@@ -101,11 +174,281 @@ def route_tool_call(state: MessagesState):
     return tool_map.get(last_message.name, END)
 
 
+def _record_llm_usage(llm_span, result, mode: str, jobs: int = 1, seconds: float = 0.0, tally=None):
+    """
+    Adds a model response's token usage to the trace span and the metrics, and to the
+    run's `tally` (a Counter) when one is given.
+    """
+    tracing.record_llm_usage(llm_span, result)
+    usage = getattr(result, "usage_metadata", None) or {}
+    # Input tokens served from the provider's prompt cache (a subset of input_tokens)
+    usage = dict(usage, cached_tokens=(usage.get("input_token_details") or {}).get("cache_read") or 0)
+    for kind in ("input", "cached", "output"):
+        tokens = usage.get(f"{kind}_tokens", 0)
+        metrics.LLM_TOKENS.inc(tokens, type=kind)
+        metrics.LLM_TOKENS_PER_JOB.observe(tokens / jobs, mode=mode, type=kind)
+        if tally is not None:
+            tally[f"{kind}_tokens"] += tokens
+    if tally is not None:
+        tally["calls"] += 1
+        tally["jobs"] += jobs
+        tally["seconds"] += seconds
+
+
+def _per_job_usage(tally) -> dict:
+    """Averages a run's tally over the jobs the model answered, e.g. to compare analysis modes."""
+    jobs = tally["jobs"]
+    if not jobs:
+        return {}
+    return {
+        "input_tokens": round(tally["input_tokens"] / jobs),
+        "cached_tokens": round(tally["cached_tokens"] / jobs),
+        "output_tokens": round(tally["output_tokens"] / jobs),
+        "seconds": round(tally["seconds"] / jobs, 2),
+        "malformed": tally["malformed"],
+    }
+
+
+def _new_analysis_scheduler() -> AdaptiveScheduler:
+    """Creates the scheduler that paces model calls for one analysis run."""
+    return AdaptiveScheduler(
+        initial_concurrency=ANALYSIS_INITIAL_CONCURRENCY,
+        max_concurrency=ANALYSIS_MAX_CONCURRENCY,
+        max_retries=ANALYSIS_MAX_RETRIES,
+        deadline=ANALYSIS_TIMEOUT,
+        span_name="analysis.task",
+    )
+
+
+def _analysis_prompt():
+    """Returns the prompt the configured analysis mode sends first."""
+    if ANALYSIS_MODE == "structured":
+        return prompts.structured_job_analysis_prompt
+    if ANALYSIS_BATCH_SIZE > 1:
+        return prompts.batch_job_analysis_prompt
+    return prompts.job_analysis_prompt
+
+
+def analysis_context_key(profile: str, prompt=None) -> str:
+    """
+    Keys everything an analysis depends on besides the job itself: cache version, model,
+    prompt (the configured one by default) and profile. Stored cards are only reused
+    under the same context.
+    """
+    template = prompts.template_text(prompt or _analysis_prompt())
+    return make_key(ANALYSIS_CACHE_VERSION, MODEL_NAME, template, profile)
+
+
+def _run_config() -> dict:
+    """
+    The per-run graph config read by handle_search_jobs: the analysis context behind
+    stored cards and the profile the pre-filter scores against. Empty if the profile
+    on disk cannot be read; analyze_job_matches then reports the error.
+    """
+    try:
+        profile = prompt_inputs.load_profile(PROFILE_JSON_PATH)
+    except (OSError, TypeError, ValueError):
+        return {}
+    return {"analysis_key": analysis_context_key(profile.table), "profile": profile.data}
+
+
+def _analysis_cache_key(profile: str, job: dict, prompt=None) -> str:
+    """
+    Keys a model response on everything that determines it, except the date: the
+    analysis context shared with the job index, plus the job. `prompt` is the one
+    the response was produced with.
+    """
+    return make_key(analysis_context_key(profile, prompt), prompt_inputs.encode_json(job))
+
+
+def _lookup_analysis(profile: str, job: dict):
+    """
+    Returns (hit, cached response) for a compact job. In batch mode answers from the
+    per-job fallback are cached under the single-job prompt, so both are checked.
+    """
+    hit, cached = analysis_cache.lookup(_analysis_cache_key(profile, job))
+    if not hit and _analysis_prompt() is prompts.batch_job_analysis_prompt:
+        hit, cached = analysis_cache.lookup(_analysis_cache_key(profile, job, prompts.job_analysis_prompt))
+    return hit, cached
+
+
+async def _invoke_analysis(analysis_model, profile: str, job: dict, today: str, tally=None) -> str:
+    """
+    Asks the model to analyze a compact job against the profile's skill table. A
+    well-formed answer (fences and preambles are tolerated) is returned as canonical
+    JSON and cached; anything else is returned raw.
+    """
+    if ANALYSIS_MODE == "structured":
+        return await _invoke_structured_analysis(analysis_model, profile, job, today, tally)
+    messages = prompts.job_analysis_prompt.format_messages(
+        profile=profile,
+        job=prompt_inputs.encode_json(job),
+        date=today
+    )
+    started = time.monotonic()
+    with tracing.span("llm.analyze", model=MODEL_NAME) as llm_span, metrics.LLM_LATENCY.time(mode="single"):
+        result = await analysis_model.ainvoke(messages)
+        _record_llm_usage(llm_span, result, "single", seconds=time.monotonic() - started, tally=tally)
+    analysis = parse_analysis(result.content)
+    if analysis is None:
+        if tally is not None:
+            tally["malformed"] += 1
+        return result.content
+    output = dump_analysis(analysis)
+    cache_key = _analysis_cache_key(profile, job, prompts.job_analysis_prompt)
+    analysis_cache.set(cache_key, output, miss_seconds=time.monotonic() - started)
+    return output
+
+
+async def _invoke_structured_analysis(analysis_model, profile: str, job: dict, today: str, tally=None) -> str:
+    """
+    Analyzes a job with the JobAnalysis schema bound to the model, so the answer arrives
+    already parsed. Returns canonical JSON like the prompt mode, or the parsing error.
+    """
+    messages = prompts.structured_job_analysis_prompt.format_messages(
+        profile=profile,
+        job=prompt_inputs.encode_json(job),
+        date=today
+    )
+    started = time.monotonic()
+    with tracing.span("llm.analyze_structured", model=MODEL_NAME) as llm_span, \
+            metrics.LLM_LATENCY.time(mode="structured"):
+        # include_raw keeps the AIMessage, which carries the token usage
+        result = await analysis_model.ainvoke(messages)
+        _record_llm_usage(llm_span, result["raw"], "structured", seconds=time.monotonic() - started, tally=tally)
+    analysis = result["parsed"]
+    if analysis is None:
+        # Refusals and truncated answers still come back unparsed
+        if tally is not None:
+            tally["malformed"] += 1
+        return result["raw"].content or str(result["parsing_error"])
+    output = dump_analysis(analysis)
+    cache_key = _analysis_cache_key(profile, job, prompts.structured_job_analysis_prompt)
+    analysis_cache.set(cache_key, output, miss_seconds=time.monotonic() - started)
+    return output
+
+
+def _parse_batch_output(text: str, count: int):
+    """
+    Validates a batch answer against the JSON-array contract and returns one
+    analysis JSON string per job in input order, or None if it is malformed.
+    """
+    data = extract_json(text)
+    if not isinstance(data, list) or len(data) != count:
+        return None
+
+    ordered = [None] * count
+    for position, element in enumerate(data):
+        index = element.pop("jobIndex", position) if isinstance(element, dict) else None
+        analysis = validate_analysis(element)
+        if analysis is None or not isinstance(index, int) or not 0 <= index < count or ordered[index] is not None:
+            return None
+        ordered[index] = dump_analysis(analysis)
+    return ordered
+
+
+async def _invoke_batch_analysis(analysis_model, profile: str, batch: list, today: str, tally=None):
+    """
+    Analyzes a batch of compact jobs in a single request that carries the profile
+    once. Returns the per-job answers, or None if the output was malformed.
+    """
+    jobs_payload = [dict(job, jobIndex=n) for n, job in enumerate(batch)]
+    messages = prompts.batch_job_analysis_prompt.format_messages(
+        profile=profile,
+        jobs=prompt_inputs.encode_json(jobs_payload),
+        count=len(batch),
+        date=today
+    )
+    started = time.monotonic()
+    with tracing.span("llm.analyze_batch", model=MODEL_NAME, batch_size=len(batch)) as llm_span, \
+            metrics.LLM_LATENCY.time(mode="batch"):
+        result = await analysis_model.ainvoke(messages)
+        _record_llm_usage(llm_span, result, "batch", len(batch), time.monotonic() - started, tally)
+    outputs = _parse_batch_output(result.content, len(batch))
+    if outputs is None:
+        if tally is not None:
+            tally["malformed"] += 1
+        log('WARNING', 'AnalyzeJobMatches', 'Malformed batch output, falling back to per-job analysis.', {'batch_size': len(batch)})
+        return None
+
+    per_job_seconds = (time.monotonic() - started) / len(batch)
+    for job, output in zip(batch, outputs):
+        cache_key = _analysis_cache_key(profile, job, prompts.batch_job_analysis_prompt)
+        analysis_cache.set(cache_key, output, miss_seconds=per_job_seconds)
+    return outputs
+
+
+async def _run_analyses(analysis_model, profile: str, jobs: dict, uncached: list, today: str, on_result=None) -> dict:
+    """
+    Runs the model for every index in `uncached`, with `jobs` mapping each index to its
+    compact job, and returns {index: result}. Each answer is cached under the prompt
+    that produced it.
+    In batch mode jobs are packed ANALYSIS_BATCH_SIZE at a time; batches that fail or
+    come back malformed are retried one job at a time. With ANALYSIS_PREFIX_WARMUP the
+    first request runs alone so the rest can read the provider's cached prompt prefix.
+    `on_result(index, result)` is called as soon as each job's final result is known.
+    """
+    scheduler = _new_analysis_scheduler()
+    tally = Counter()
+    results = {}
+    per_job = uncached
+    on_result = on_result or (lambda i, result: None)
+
+    async def fan_out(factories: list, on_done):
+        if ANALYSIS_PREFIX_WARMUP and len(factories) > 1:
+            first = await scheduler.run(factories[:1], on_done=on_done)
+            rest = await scheduler.run(factories[1:], on_done=lambda n, result: on_done(n + 1, result))
+            return first + rest
+        return await scheduler.run(factories, on_done=on_done)
+
+    if ANALYSIS_BATCH_SIZE > 1 and ANALYSIS_MODE != "structured":
+        batches = [uncached[n:n + ANALYSIS_BATCH_SIZE] for n in range(0, len(uncached), ANALYSIS_BATCH_SIZE)]
+
+        def batch_done(n: int, outputs):
+            # Malformed batches are reported by the per-job fallback instead
+            if isinstance(outputs, list):
+                for i, output in zip(batches[n], outputs):
+                    on_result(i, output)
+
+        batch_results = await fan_out([
+            lambda batch=batch: _invoke_batch_analysis(
+                analysis_model, profile, [jobs[i] for i in batch], today, tally
+            )
+            for batch in batches
+        ], batch_done)
+        per_job = []
+        for batch, outputs in zip(batches, batch_results):
+            if isinstance(outputs, list):
+                results.update(zip(batch, outputs))
+            else:
+                per_job.extend(batch)
+
+    per_job_results = await fan_out([
+        lambda job=jobs[i]: _invoke_analysis(analysis_model, profile, job, today, tally)
+        for i in per_job
+    ], lambda n, result: on_result(per_job[n], result))
+    results.update(zip(per_job, per_job_results))
+    per_job_usage = _per_job_usage(tally)
+    log('INFO', 'AnalyzeJobMatches', 'Model fan-out finished.', {
+        'scheduler': scheduler.stats(),
+        'analysis_mode': ANALYSIS_MODE,
+        'batch_size': ANALYSIS_BATCH_SIZE,
+        'per_job_calls': len(per_job),
+        'per_job_usage': per_job_usage,
+    })
+    if per_job_usage:
+        print(f"--- Per job ({ANALYSIS_MODE} mode): {per_job_usage['input_tokens']} input "
+              f"({per_job_usage['cached_tokens']} cached) / {per_job_usage['output_tokens']} output tokens, {per_job_usage['seconds']}s, "
+              f"{per_job_usage['malformed']} malformed answers ---")
+    return results
+
+
 async def analyze_job_matches(state: MessagesState):
     """
     Analyzes job search results against a user profile by iterating through each job,
     invoking the analysis model for each one concurrently to get an HTML block,
-    and compiling the results into a single JSON array for the RSS feed.
+    and compiling the results into a single JSON array for the RSS feed. With the
+    `stream_cards` config flag each card is instead streamed out as soon as it is ready.
     """
     print("\n--- Analyzing Job Matches ---")
     log('INFO', 'AnalyzeJobMatches', 'Starting job match analysis.')
@@ -129,10 +472,9 @@ async def analyze_job_matches(state: MessagesState):
         log('INFO', 'AnalyzeJobMatches', 'No valid jobs found to analyze.')
         return {"messages": [AIMessage(content="No valid jobs found to analyze.")]}
 
-    # Load user profile
+    # Load user profile (cached until the file changes)
     try:
-        with open(PROFILE_JSON_PATH, 'r') as f:
-            profile_data = json.load(f)
+        profile = prompt_inputs.load_profile(PROFILE_JSON_PATH)
     except FileNotFoundError as e:
         log('ERROR', 'AnalyzeJobMatches', 'Profile JSON file not found.', {'path': PROFILE_JSON_PATH, 'error': str(e)})
         return {"messages": [AIMessage(content=f"Error: Your profile file was not found at {PROFILE_JSON_PATH}.")]}
@@ -141,59 +483,129 @@ async def analyze_job_matches(state: MessagesState):
         return {"messages": [AIMessage(content=f"Error: I couldn't read your profile file at {PROFILE_JSON_PATH}.")]}
 
     today = datetime.today().strftime("%B %d, %Y")
-    analysis_model = init_chat_model(MODEL_NAME)
-    compiled_responses = []
-    
-    analysis_tasks = []
-    for job in jobs_data:
-        formatted_prompt = prompts.job_analysis_prompt.format(
-            profile=json.dumps(profile_data, indent=2),
-            job=json.dumps(job, indent=2),
-            date=today
-        )
-        analysis_tasks.append(analysis_model.ainvoke(formatted_prompt))
-
-    log('INFO', 'AnalyzeJobMatches', f'Starting analysis of {len(analysis_tasks)} jobs.')
-    print(f"--- Starting analysis of {len(analysis_tasks)} jobs concurrently ---")
-    analysis_results = await asyncio.gather(*analysis_tasks, return_exceptions=True)
+    runtime = get_runtime()
+    if ANALYSIS_MODE == "structured":
+        analysis_model = runtime.get_structured_analysis_model()
+    else:
+        analysis_model = runtime.get_analysis_model()
+
+    # Unchanged jobs reuse the card stored by a previous run; only new or
+    # changed postings are sent to the model.
+    analysis_key = analysis_context_key(profile.table)
+    stored_cards = [job_index.get_card(job, analysis_key) if isinstance(job, dict) else None for job in jobs_data]
+    pending = [i for i, card in enumerate(stored_cards) if card is None]
+
+    # Jobs are sent as minified JSON with only the fields the analysis reads, and the
+    # profile as a compact skill table. Cached responses are answered locally; the rest
+    # go through the adaptive scheduler.
+    compact_jobs = {i: prompt_inputs.compact_job(jobs_data[i]) for i in pending}
+    analysis_results = {}
+    uncached = []
+    for i in pending:
+        hit, cached = _lookup_analysis(profile.table, compact_jobs[i])
+        if hit:
+            analysis_results[i] = cached
+        else:
+            uncached.append(i)
 
-    for i, result in enumerate(analysis_results):
-        job = jobs_data[i]
+    log('INFO', 'AnalyzeJobMatches', f'Starting analysis of {len(uncached)} jobs.', {
+        'reused_cards': len(jobs_data) - len(pending),
+        'cached_analyses': len(pending) - len(uncached),
+    })
+    print(f"--- Starting analysis of {len(uncached)} jobs ({len(jobs_data) - len(pending)} unchanged, "
+          f"{len(pending) - len(uncached)} cached) ---")
+    if uncached:
+        batched = ANALYSIS_BATCH_SIZE > 1 and ANALYSIS_MODE != "structured"
+        savings = prompt_inputs.encoding_savings(
+            profile,
+            [jobs_data[i] for i in uncached],
+            [compact_jobs[i] for i in uncached],
+            math.ceil(len(uncached) / ANALYSIS_BATCH_SIZE) if batched else len(uncached),
+        )
+        log('INFO', 'AnalyzeJobMatches', 'Prompt encoding savings.', savings)
+        print(f"--- Compact prompts saved {savings['tokens_saved']} input tokens "
+              f"({savings['saved_ratio']:.0%}) this run ---")
+    # Each card is rendered as soon as its result is known and streamed to the caller
+    # (stream_mode="custom"); nothing is emitted when the graph is not being streamed.
+    emit = get_stream_writer()
+    stream_cards = get_config().get("configurable", {}).get("stream_cards", False)
+    cards = {}
+
+    def finish(i: int, result=None):
+        job = jobs_data[i] if isinstance(jobs_data[i], dict) else {}
         company_name = job.get('company', 'Unknown Company')
         job_title = job.get('job_title', 'N/A')
         job_identifier = f"{job_title} at {company_name}"
-        
+
         html_content = ""
-        
-        if isinstance(result, Exception):
+        # Only analyzed cards get a job_id: the feed store skips the rest, so a failed
+        # analysis never replaces a good entry for the same job.
+        job_id = job_index.job_key(job)
+
+        if stored_cards[i] is not None:
+            html_content = stored_cards[i]
+        elif isinstance(result, Exception):
             log('ERROR', 'AnalyzeJobMatches', f'Error analyzing job: {job_identifier}', {'exception': str(result)})
             print(f"--- Error analyzing job: {job_identifier} ---")
             print(f"Exception: {result}")
             html_content = f"<h2>Error analyzing job: {job_title}</h2><p>An exception occurred during analysis: {result}</p>"
+            job_id = None
         else:
-            log('INFO', 'AnalyzeJobMatches', f'Successfully processed analysis for job: {job_identifier}')
-            print(f"--- Successfully processed analysis for job: {job_identifier} ---")
-            # The result from the LLM is a JSON string.
-            # We now pass it to the render_job_card function to get the final HTML.
-            analysis_json = result.content
-            html_content = render_job_card(analysis_json)
-
-        compiled_responses.append({
+            analysis = parse_analysis(result)
+            if analysis is None:
+                log('ERROR', 'AnalyzeJobMatches', f'Unparseable analysis for job: {job_identifier}', {'output': result})
+                print(f"--- Unparseable analysis for job: {job_identifier} ---")
+                html_content = render_error_card(result)
+                job_id = None
+            else:
+                log('INFO', 'AnalyzeJobMatches', f'Successfully processed analysis for job: {job_identifier}')
+                print(f"--- Successfully processed analysis for job: {job_identifier} ---")
+                # The model output has been validated; render_analysis turns it into the final HTML.
+                html_content = render_analysis(analysis)
+                # A card analyzed without the posting's description is not kept, so the
+                # job is scraped and analyzed again on the next run.
+                if job.get('job_description'):
+                    job_index.record_card(job, job_title, html_content, analysis_key)
+
+        cards[i] = {
+            "job_id": job_id,
+            "linkedin_url": job.get('linkedin_url'),
             "job_title": f"{job_title}",
             "job_html": html_content
-        })
-
+        }
+        emit({"feed_card": cards[i]})
+
+    # Stored and cached cards are ready before any model call
+    for i in range(len(jobs_data)):
+        if stored_cards[i] is not None:
+            finish(i)
+        elif i in analysis_results:
+            finish(i, analysis_results[i])
+
+    analysis_results.update(await _run_analyses(analysis_model, profile.table, compact_jobs, uncached, today, on_result=finish))
+    failed = sum(1 for i in uncached if isinstance(analysis_results[i], Exception))
+    metrics.JOBS.inc(len(pending) - len(uncached), stage="cached")
+    metrics.JOBS.inc(len(uncached) - failed, stage="analyzed")
+    metrics.JOBS.inc(failed, stage="failed")
+
+    compiled_responses = [cards[i] for i in sorted(cards)]
+    log('INFO', 'AnalyzeJobMatches', 'Finished job match analysis.', {
+        'jobs_analyzed': len(compiled_responses),
+        'analysis_cache': analysis_cache.stats(),
+    })
+    if stream_cards:
+        # The caller already received every card; an empty array keeps the output format
+        return {"messages": [AIMessage(content="[]")]}
     final_content = json.dumps(compiled_responses, indent=2)
     analysis_result_message = AIMessage(content=final_content)
-    log('INFO', 'AnalyzeJobMatches', 'Finished job match analysis.', {'jobs_analyzed': len(compiled_responses)})
     return {"messages": [analysis_result_message]}
 
 
 def build_graph(call_model_node, tool_node):
     """Builds and compiles the LangGraph StateGraph."""
     builder = StateGraph(MessagesState)
-    builder.add_node("call_model", call_model_node)
-    builder.add_node("tools", tool_node)
+    builder.add_node("call_model", tracing.traced_node("call_model", call_model_node))
+    builder.add_node("tools", tracing.traced_node("tools", tool_node))
 
     # Add tool handler nodes
     handler_nodes = {
@@ -205,10 +617,10 @@ def build_graph(call_model_node, tool_node):
         "handle_search_jobs": handle_search_jobs,
     }
     for name, node in handler_nodes.items():
-        builder.add_node(name, node)
+        builder.add_node(name, tracing.traced_node(name, node))
 
     # Add the new analysis node
-    builder.add_node("analyze_job_matches", analyze_job_matches)
+    builder.add_node("analyze_job_matches", tracing.traced_node("analyze_job_matches", analyze_job_matches))
 
     # Define edges
     builder.add_edge(START, "call_model")
@@ -234,37 +646,251 @@ def build_graph(call_model_node, tool_node):
     return builder.compile()
 
 
-async def run_agent():
-    """Runs the agent to get job analysis and returns the content."""
+def build_search_pipeline():
+    """Builds the search-result pipeline: enrichment followed by analysis, without the tool-calling model."""
+    builder = StateGraph(MessagesState)
+    builder.add_node("handle_search_jobs", tracing.traced_node("handle_search_jobs", handle_search_jobs))
+    builder.add_node("analyze_job_matches", tracing.traced_node("analyze_job_matches", analyze_job_matches))
+    builder.add_edge(START, "handle_search_jobs")
+    builder.add_edge("handle_search_jobs", "analyze_job_matches")
+    builder.add_edge("analyze_job_matches", END)
+    return builder.compile()
+
+
+def pick_queries(budget: int) -> list:
+    """Picks up to `budget` distinct search queries for this run."""
+    if not isinstance(prompts.jobs_query, list) or not prompts.jobs_query:
+        return ["AI Engineer"] # Fallback
+    return random.sample(prompts.jobs_query, min(max(budget, 1), len(prompts.jobs_query)))
+
+
+def parse_search_results(content) -> list:
+    """
+    Normalizes search_jobs tool output into a list of job dicts. The MCP adapter returns
+    a JSON string, or a list of JSON strings when the server emits one content block per job.
+    """
+    blocks = content if isinstance(content, list) else [content]
+    jobs = []
+    for block in blocks:
+        if isinstance(block, dict) and "text" in block:
+            block = block["text"]
+        try:
+            parsed = json.loads(block) if isinstance(block, str) else block
+        except json.JSONDecodeError:
+            continue
+        if isinstance(parsed, list):
+            jobs.extend(job for job in parsed if isinstance(job, dict))
+        elif isinstance(parsed, dict):
+            jobs.append(parsed)
+    return jobs
+
+
+async def search_jobs_multi(client, queries: list) -> list:
+    """
+    Runs search_jobs for every query concurrently over a single MCP session, caps each
+    query's results and merges them, dropping duplicate postings by job ID.
+    """
+    semaphore = asyncio.Semaphore(SEARCH_CONCURRENCY)
+
+    async with client.session("linkedinmcp") as session:
+        tools = await load_mcp_tools(session)
+        search_tool = next(tool for tool in tools if tool.name == "search_jobs")
+
+        async def search(query: str):
+            async with semaphore:
+                with tracing.span("mcp.search_jobs", query=query) as search_span:
+                    result = await search_tool.ainvoke({**SEARCH_JOBS_EXTRA_ARGS, SEARCH_JOBS_QUERY_ARG: query})
+                    search_span.set(bytes=len(result if isinstance(result, str) else json.dumps(result)))
+                    return result
+
+        results = await asyncio.gather(*(search(q) for q in queries), return_exceptions=True)
+
+    merged, seen, duplicates = [], set(), 0
+    for query, result in zip(queries, results):
+        if isinstance(result, Exception):
+            log('WARNING', 'RunAgent', f'search_jobs failed for query: {query}', {'error': str(result)})
+            continue
+        jobs = parse_search_results(result)
+        if QUERY_RESULT_CAP:
+            jobs = jobs[:QUERY_RESULT_CAP]
+        for job in jobs:
+            key = job_index.job_key(job)
+            if key in seen:
+                duplicates += 1
+                continue
+            seen.add(key)
+            merged.append(job)
+
+    log('INFO', 'RunAgent', f'Merged {len(merged)} unique jobs from {len(queries)} queries.', {'queries': queries, 'duplicates': duplicates})
+    return merged
+
+
+async def _invoke_graph(graph, inputs: dict, on_card=None) -> dict:
+    """
+    Runs a compiled graph and returns its final state. With `on_card`, the graph is
+    streamed and every feed card is passed to `on_card` as soon as it is rendered.
+    """
+    configurable = _run_config()
+    if on_card is None:
+        return await graph.ainvoke(inputs, {"configurable": configurable})
+    final_state = None
+    async for mode, chunk in graph.astream(
+        inputs, {"configurable": dict(configurable, stream_cards=True)}, stream_mode=["custom", "values"]
+    ):
+        if mode == "custom" and "feed_card" in chunk:
+            on_card(chunk["feed_card"])
+        elif mode == "values":
+            final_state = chunk
+    return final_state
+
+
+async def run_search_pipeline(jobs: list, pipeline=None, on_card=None) -> str:
+    """Feeds search results straight into enrichment and analysis and returns the analysis content."""
+    tool_message = ToolMessage(content=json.dumps(jobs), name="search_jobs", tool_call_id="search_jobs")
+    pipeline = pipeline or build_search_pipeline()
+    final_state = await _invoke_graph(pipeline, {"messages": [tool_message]}, on_card)
+    return final_state['messages'][-1].content
+
+
+class AgentRuntime:
+    """
+    Owns the long-lived agent resources (chat models, MCP client, tool bindings and
+    compiled graphs) so they stay warm across scheduled runs instead of being rebuilt.
+    The MCP tool list is loaded once and only re-fetched after reconnect(), which a
+    failed health check triggers.
+    """
+
+    def __init__(self):
+        self.client = None
+        self.healthy = False
+        self._model = None
+        self._structured_analysis_model = None
+        self._agent_graph = None
+        self._search_pipeline = None
+
+    def get_client(self):
+        if self.client is None:
+            self.client = create_mcp_client()
+        return self.client
+
+    def get_model(self):
+        if self._model is None:
+            self._model = init_chat_model(MODEL_NAME)
+        return self._model
+
+    def get_analysis_model(self):
+        # Same model as the agent; tool bindings return new runnables and leave it untouched
+        return self.get_model()
+
+    def get_structured_analysis_model(self):
+        """The analysis model with the JobAnalysis schema bound as its response format."""
+        if self._structured_analysis_model is None:
+            self._structured_analysis_model = self.get_analysis_model().with_structured_output(
+                JobAnalysis, method=ANALYSIS_STRUCTURED_METHOD, include_raw=True
+            )
+        return self._structured_analysis_model
+
+    def get_search_pipeline(self):
+        if self._search_pipeline is None:
+            self._search_pipeline = build_search_pipeline()
+        return self._search_pipeline
+
+    async def get_agent_graph(self):
+        """Returns the compiled agent graph, loading the MCP tool list on first use or after a reconnect."""
+        if self._agent_graph is None:
+            model_with_tools, tool_node = await setup_tools_and_model(self.get_client(), self.get_model())
+
+            async def call_model(state: MessagesState):
+                """Invokes the model with the current state."""
+                messages = state["messages"]
+                with tracing.span("llm.call_model", model=MODEL_NAME) as llm_span:
+                    response = await model_with_tools.ainvoke(messages)
+                    tracing.record_llm_usage(llm_span, response)
+                return {"messages": [response]}
+
+            self._agent_graph = build_graph(call_model, tool_node)
+            log('INFO', 'AgentRuntime', 'Loaded MCP tools and compiled the agent graph.')
+        return self._agent_graph
+
+    def reconnect(self):
+        """Drops the MCP client and tool bindings so the next use builds fresh ones."""
+        self.client = None
+        self._agent_graph = None
+        self.healthy = False
+
+    async def health_check(self, timeout: float = 30) -> bool:
+        """Checks the MCP server is reachable, reconnecting once on failure."""
+        for attempt in range(2):
+            try:
+                await asyncio.wait_for(self.get_client().get_tools(), timeout)
+                self.healthy = True
+                return True
+            except Exception as e:
+                log('WARNING', 'AgentRuntime', 'MCP health check failed.', {'attempt': attempt + 1, 'error': str(e)})
+                self.reconnect()
+        return False
+
+
+_runtime = None
+
+
+def get_runtime() -> AgentRuntime:
+    """Returns the process-wide AgentRuntime."""
+    global _runtime
+    if _runtime is None:
+        _runtime = AgentRuntime()
+    return _runtime
+
+
+async def run_agent(on_card=None):
+    """
+    Runs the agent to get job analysis and returns the content. With `on_card`, each
+    rendered card is passed to it as soon as it is ready instead of being returned.
+    """
     init_db() # Ensure the database is ready
+    # Every span and log entry of this run carries its run ID, so the run can be read back by index
+    started = time.monotonic()
+    status = "error"
+    try:
+        with tracing.run_trace("run_agent"):
+            response = await _run_agent(on_card)
+        status = "success"
+        return response
+    finally:
+        metrics.RUNS.inc(status=status)
+        metrics.RUN_DURATION.observe(time.monotonic() - started, status=status)
+
+
+async def _run_agent(on_card=None):
     log('INFO', 'RunAgent', 'Starting agent run.')
+    runtime = get_runtime()
     try:
-        # 1. Initialize model and client
-        model = init_chat_model(MODEL_NAME)
-        client = create_mcp_client()
-
-        # 2. Setup tools and bind to model
-        model_with_tools, tool_node = await setup_tools_and_model(client, model)
-
-        # 3. Define the model calling node (closure to capture model_with_tools)
-        async def call_model(state: MessagesState):
-            """Invokes the model with the current state."""
-            messages = state["messages"]
-            response = await model_with_tools.ainvoke(messages)
-            return {"messages": [response]}
-
-        # 4. Build the graph
-        graph = build_graph(call_model, tool_node)
-
-        # 5. Use a default or random query
-        if isinstance(prompts.jobs_query, list) and prompts.jobs_query:
-            user_query = random.choice(prompts.jobs_query)
-        else:
-            user_query = "AI Engineer" # Fallback
+        # A previous run failed: make sure the MCP server is back before starting.
+        if not runtime.healthy and not await runtime.health_check():
+            raise ConnectionError("MCP server is unreachable.")
+        client = runtime.get_client()
+
+        # Direct mode calls search_jobs with known arguments and skips the tool-calling model.
+        # Several queries per run always use it, since their results are merged before analysis.
+        queries = pick_queries(RUN_QUERY_BUDGET)
+        if RUN_MODE == "direct" or len(queries) > 1:
+            log('INFO', 'RunAgent', f'Running direct search pipeline with {len(queries)} job queries.', {'queries': queries})
+            response = await run_search_pipeline(await search_jobs_multi(client, queries), runtime.get_search_pipeline(), on_card)
+            log('INFO', 'RunAgent', 'Agent run completed successfully.')
+            return response
+
+        # Agent mode: the model decides to call search_jobs through the full graph.
+        # The runtime keeps the model, tool bindings and compiled graph warm between runs.
+        graph = await runtime.get_agent_graph()
+
+        # Use the randomly picked query
+        user_query = queries[0]
         log('INFO', 'RunAgent', f'Using job query: {user_query}')
 
-        final_state = await graph.ainvoke(
-            {"messages": [{"role": "user", "content": f"search for jobs using the following query: {user_query}"}]}
+        final_state = await _invoke_graph(
+            graph,
+            {"messages": [{"role": "user", "content": f"search for jobs using the following query: {user_query}"}]},
+            on_card
         )
 
         response = final_state['messages'][-1].content
@@ -272,5 +898,6 @@ async def run_agent():
         return response
     except Exception as e:
         log('CRITICAL', 'RunAgent', 'Agent run failed with an unhandled exception.', {'error': str(e)})
+        runtime.healthy = False
         # Re-raise the exception after logging to ensure the caller is aware of the failure
         raise
\ No newline at end of file
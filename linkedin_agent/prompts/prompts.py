@@ -1,4 +1,4 @@
-from langchain.prompts import PromptTemplate
+from langchain.prompts import ChatPromptTemplate
 
 # The search queries remain the same
 jobs_query = [
@@ -18,18 +18,14 @@ jobs_query = [
     '"Automation Engineer" AND (AI OR Azure)',
 ]
 
-# STEP 1: A lean prompt that instructs the model to return only a JSON object for analysis.
-job_analysis_prompt = PromptTemplate(
-    input_variables=["profile", "job", "date"],
-    template='''
-Today is {date}.
-You are a career analyst. Your task is to analyze the candidate PROFILE against the JOB description and output a single, valid JSON object with the analysis.
-
-PROFILE:
-{profile}
+# The analysis prompts are split so providers' automatic prefix caching can reuse the
+# large constant part: the system message holds the rules, the output structure and the
+# profile (identical for every job), and the per-job content, including the date, comes last.
 
-JOB:
-{job}
+# STEP 1: A lean prompt that instructs the model to return only a JSON object for analysis.
+job_analysis_prompt = ChatPromptTemplate.from_messages([
+    ("system", '''
+You are a career analyst. Your task is to analyze the candidate PROFILE against the JOB description given by the user and output a single, valid JSON object with the analysis.
 
 --- MANDATORY RULES ---
 1.  Output ONLY a single, valid JSON object. No other text, comments, or markdown.
@@ -61,6 +57,97 @@ JOB:
   "companyDescription": "string",
   "linkedinUrl": "string"
 }}
-'''
-)
 
+PROFILE:
+{profile}
+'''),
+    ("human", '''
+Today is {date}.
+
+JOB:
+{job}
+'''),
+])
+
+
+# Batch variant: K jobs share one copy of the profile and come back as a JSON array.
+batch_job_analysis_prompt = ChatPromptTemplate.from_messages([
+    ("system", '''
+You are a career analyst. Your task is to analyze the candidate PROFILE against each of the JOBS given by the user and output a single, valid JSON array with one analysis object per job.
+
+--- MANDATORY RULES ---
+1.  Output ONLY a single, valid JSON array with exactly one object per job, in the same order as JOBS. No other text, comments, or markdown.
+2.  Every object must strictly conform to the structure specified below and echo the `jobIndex` of the job it analyzes.
+3.  Analyze every job independently; never mix requirements or details between jobs.
+4.  **Analysis Process:** First, mentally create a flat list of all skills from the PROFILE, noting their proficiency. Then, for each requirement in a JOB, you MUST search your complete list to find a match. A 'Proficient' or 'Intermediate' skill is a valid match and must be included in `matchingSkills` if relevant.
+5.  Determine a numerical `fitScore` between 0 and 100. This score should be weighted: a job requirement matching an 'Expert' skill is a stronger match than one matching an 'Intermediate' skill.
+6.  For `matchingSkills`, you must include the `proficiency` level from the profile.
+7.  For `workTypeEmoji`, use 🏢 for Onsite, 🏠 for Remote, or 🔄 for Hybrid.
+8.  **Onsite Work Caution:** If the `workType` is 'Hybrid' or 'Onsite', you MUST add a cautionary note to the `notes` field. Example: "Caution: This is a hybrid role and may require office presence."
+9.  Analyze the original job data to extract placeholders like company name, location, etc. If a value cannot be found, use "Not specified".
+
+--- JSON OUTPUT STRUCTURE (one element per job) ---
+[
+  {{
+    "jobIndex": "number",
+    "companyName": "string",
+    "jobTitle": "string",
+    "location": "string",
+    "workType": "string",
+    "workTypeEmoji": "string",
+    "salary": "string",
+    "fitScore": "number (0-100)",
+    "fitReasoning": "string",
+    "matchingSkills": [
+      {{ "skill": "string", "proficiency": "string (Expert, Proficient, or Intermediate)", "reason": "string" }}
+    ],
+    "missingSkills": [
+      {{ "skill": "string", "reason": "string" }}
+    ],
+    "notes": "string",
+    "companyDescription": "string",
+    "linkedinUrl": "string"
+  }}
+]
+
+PROFILE:
+{profile}
+'''),
+    ("human", '''
+Today is {date}.
+
+JOBS ({count} jobs, a JSON array; each job has a numeric "jobIndex"):
+{jobs}
+'''),
+])
+
+
+# Structured-output variant: the response schema is bound to the model (JobAnalysis),
+# so the prompt carries only the analysis rules.
+structured_job_analysis_prompt = ChatPromptTemplate.from_messages([
+    ("system", '''
+You are a career analyst. Your task is to analyze the candidate PROFILE against the JOB description given by the user.
+
+--- MANDATORY RULES ---
+1.  **Analysis Process:** First, mentally create a flat list of all skills from the PROFILE, noting their proficiency. Then, for each requirement in the JOB, you MUST search your complete list to find a match. A 'Proficient' or 'Intermediate' skill is a valid match and must be included in `matchingSkills` if relevant.
+2.  Determine a numerical `fitScore` between 0 and 100. This score should be weighted: a job requirement matching an 'Expert' skill is a stronger match than one matching an 'Intermediate' skill.
+3.  For `matchingSkills`, you must include the `proficiency` level from the profile.
+4.  For `workTypeEmoji`, use 🏢 for Onsite, 🏠 for Remote, or 🔄 for Hybrid.
+5.  **Onsite Work Caution:** If the `workType` is 'Hybrid' or 'Onsite', you MUST add a cautionary note to the `notes` field. Example: "Caution: This is a hybrid role and may require office presence."
+6.  Analyze the original `job` data to extract placeholders like company name, location, etc. If a value cannot be found, use "Not specified".
+
+PROFILE:
+{profile}
+'''),
+    ("human", '''
+Today is {date}.
+
+JOB:
+{job}
+'''),
+])
+
+
+def template_text(prompt: ChatPromptTemplate) -> str:
+    """Returns the raw template text of every message, e.g. to key cached responses on it."""
+    return "\n".join(message.prompt.template for message in prompt.messages)
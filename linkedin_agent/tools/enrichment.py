@@ -0,0 +1,200 @@
+import asyncio
+import os
+import random
+import time
+from contextlib import asynccontextmanager
+from urllib.parse import urlparse
+
+import httpx
+
+from linkedin_agent.tools.tavily_search_tools import (
+    TAVILY_SEARCH_URL,
+    company_cache,
+    fetch_company_async,
+    lookup_company,
+    normalize_company_name,
+)
+from linkedin_agent.tools.linkedin_requests import retrieve_job_details_async
+from linkedin_agent.utils import metrics
+from linkedin_agent.utils.mysql_logger import log
+from linkedin_agent.utils.tracing import current_span, span
+
+# --- Configuration ---
+# Maximum number of in-flight requests against a single host.
+ENRICH_MAX_PER_HOST = int(os.getenv("ENRICH_MAX_PER_HOST", "2"))
+# Token-bucket pacing per host (requests per second and burst size).
+# LinkedIn is scraped, so keep it polite; Tavily is a paid API and can go faster.
+LINKEDIN_RATE_PER_SEC = float(os.getenv("LINKEDIN_RATE_PER_SEC", "0.2"))
+TAVILY_RATE_PER_SEC = float(os.getenv("TAVILY_RATE_PER_SEC", "2"))
+DEFAULT_RATE_PER_SEC = float(os.getenv("ENRICH_RATE_PER_SEC", "1"))
+ENRICH_BURST = int(os.getenv("ENRICH_BURST", "2"))
+ENRICH_TIMEOUT = float(os.getenv("ENRICH_TIMEOUT", "30"))
+
+HOST_RATES = {
+    "www.linkedin.com": LINKEDIN_RATE_PER_SEC,
+    "linkedin.com": LINKEDIN_RATE_PER_SEC,
+    "api.tavily.com": TAVILY_RATE_PER_SEC,
+}
+
+
+class TokenBucket:
+    """Async token bucket: `rate` tokens per second, holding at most `capacity`."""
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = max(1, capacity)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._not_before = 0.0
+        self._lock = asyncio.Lock()
+
+    def defer(self, seconds: float):
+        """Holds back every token for `seconds`, e.g. when the host answered 429 with Retry-After."""
+        self._not_before = max(self._not_before, time.monotonic() + seconds)
+        # No burst once the pause is over: tokens refill from zero from then on
+        self._tokens = 0.0
+        self._updated = max(self._updated, self._not_before)
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._not_before:
+                    await asyncio.sleep(self._not_before - now)
+                    continue
+                self._tokens = min(self.capacity, self._tokens + max(0.0, now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                # Sleep until the next token is due, with a little jitter so
+                # requests do not land on a perfectly regular beat.
+                wait = (1 - self._tokens) / self.rate
+                await asyncio.sleep(wait + random.uniform(0, wait * 0.25))
+
+
+class HostThrottle:
+    """
+    Per-host concurrency limit plus token-bucket pacing. Every request takes a slot and
+    a token; fetchers that retry take a fresh one per attempt and back off without a slot.
+    """
+
+    def __init__(self, max_per_host: int = ENRICH_MAX_PER_HOST, burst: int = ENRICH_BURST):
+        self.max_per_host = max_per_host
+        self.burst = burst
+        self._semaphores = {}
+        self._buckets = {}
+
+    def _for_host(self, host: str):
+        if host not in self._semaphores:
+            self._semaphores[host] = asyncio.Semaphore(self.max_per_host)
+            rate = HOST_RATES.get(host, DEFAULT_RATE_PER_SEC)
+            self._buckets[host] = TokenBucket(rate, self.burst)
+        return self._semaphores[host], self._buckets[host]
+
+    @asynccontextmanager
+    async def slot(self, url: str):
+        """Holds one of the host's request slots, after spending a token, for a single request."""
+        semaphore, bucket = self._for_host(urlparse(url).hostname or "")
+        started = time.monotonic()
+        async with semaphore:
+            await bucket.acquire()
+            current_span().add("wait_ms", round((time.monotonic() - started) * 1000))
+            yield
+
+    def defer(self, url: str, seconds: float):
+        """Pauses every request to the host of `url` for `seconds`."""
+        self._for_host(urlparse(url).hostname or "")[1].defer(seconds)
+
+    async def track(self, url: str, coro_factory):
+        """
+        Runs `coro_factory()` under the host's fetch span and metrics without pacing it;
+        the coroutine takes `slot(url)` itself, once per attempt.
+        """
+        host = urlparse(url).hostname or ""
+        # One span per fetch: throttle wait is recorded by slot(), response bytes by the fetcher.
+        with span(f"fetch:{host}"), metrics.FETCH_LATENCY.time(host=host):
+            try:
+                result = await coro_factory()
+            except Exception:
+                metrics.FETCHES.inc(host=host, status="error")
+                raise
+            metrics.FETCHES.inc(host=host, status="ok")
+            return result
+
+    async def run(self, url: str, coro_factory):
+        """Runs `coro_factory()` once the host of `url` has capacity and a token."""
+        async def paced():
+            async with self.slot(url):
+                return await coro_factory()
+        return await self.track(url, paced)
+
+
+# Shared async HTTP client, recreated if the owning event loop changes.
+_http_client = None
+_http_client_loop = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Returns the shared httpx.AsyncClient for the running event loop."""
+    global _http_client, _http_client_loop
+    loop = asyncio.get_running_loop()
+    if _http_client is None or _http_client.is_closed or _http_client_loop is not loop:
+        _http_client = httpx.AsyncClient(
+            timeout=ENRICH_TIMEOUT,
+            follow_redirects=True,
+            limits=httpx.Limits(max_keepalive_connections=10, max_connections=20),
+        )
+        _http_client_loop = loop
+    return _http_client
+
+
+async def _enrich_field(job: dict, field: str, fetch):
+    """Awaits a single enrichment field; failures are isolated to the job."""
+    try:
+        job[field] = await fetch
+    except Exception as e:
+        job[field] = None
+        log('WARNING', 'Enrichment', f'Failed to fetch {field}.', {'job': job.get('linkedin_url'), 'error': str(e)})
+
+
+async def enrich_jobs(jobs: list) -> list:
+    """
+    Adds `company_description` (Tavily) and `job_description` (LinkedIn) to every job.
+    All lookups run concurrently, while HostThrottle keeps each domain paced.
+    Cached companies are answered locally and each company is fetched at most once per run.
+    """
+    client = get_http_client()
+    throttle = HostThrottle()
+    company_fetches = {}
+    tasks = []
+    for job in jobs:
+        if not isinstance(job, dict):
+            continue
+        company_name = job.get('company')
+        if company_name:
+            hit, answer = lookup_company(company_name)
+            if hit:
+                job['company_description'] = answer
+            else:
+                company_key = normalize_company_name(company_name)
+                if company_key not in company_fetches:
+                    company_fetches[company_key] = asyncio.ensure_future(throttle.run(
+                        TAVILY_SEARCH_URL, lambda name=company_name: fetch_company_async(client, name)
+                    ))
+                tasks.append(_enrich_field(job, 'company_description', company_fetches[company_key]))
+        linkedin_url = job.get('linkedin_url')
+        if linkedin_url:
+            # The fetcher retries, so it takes a throttle slot per attempt
+            tasks.append(_enrich_field(job, 'job_description', throttle.track(
+                linkedin_url, lambda url=linkedin_url: retrieve_job_details_async(client, url, throttle)
+            )))
+
+    started = time.monotonic()
+    await asyncio.gather(*tasks)
+    log('INFO', 'Enrichment', f'Enriched {len(jobs)} jobs.', {
+        'requests': len(tasks),
+        'seconds': round(time.monotonic() - started, 2),
+        'company_cache': company_cache.stats(),
+    })
+    return jobs
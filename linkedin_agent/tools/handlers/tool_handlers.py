@@ -1,22 +1,43 @@
 import json
-import random
-import time
+from langgraph.config import get_config
 from langgraph.graph import MessagesState
-from linkedin_agent.tools.tavily_search_tools import search_company
-from linkedin_agent.tools.linkedin_requests import retrieve_job_details
+from linkedin_agent.tools.enrichment import enrich_jobs
+from linkedin_agent.utils import job_index, metrics
+from linkedin_agent.utils.mysql_logger import log
+from linkedin_agent.utils.prefilter import prefilter_jobs, screen_jobs
+
+
+def _drop_rejected(objects: list, new_jobs: list, kept: list, rejected: list, stage: str):
+    """Removes rejected new jobs from the search results; returns (objects, kept new jobs)."""
+    if rejected:
+        log('INFO', 'ProcessJobs', f'Pre-filter ({stage}) rejected {len(rejected)} jobs.', {
+            'rejected': [{'job_title': new_jobs[p].get('job_title'), 'reason': reason} for p, reason in rejected],
+        })
+        print(f"--- Pre-filter ({stage}) rejected {len(rejected)} of {len(new_jobs)} jobs ---")
+    metrics.JOBS.inc(len(rejected), stage="prefiltered")
+    rejected_ids = {id(new_jobs[p]) for p, _ in rejected}
+    return [obj for obj in objects if id(obj) not in rejected_ids], [new_jobs[p] for p in kept]
+
 
 # A method to iterate and append a property
-def process_jobs(objects):
+async def process_jobs(objects, analysis_key: str = None, profile: dict = None):
     if isinstance(objects, list):
-        for obj in objects:
-            if isinstance(obj, dict):
-                delay = random.randint(3, 10)
-                print(f"Waiting for {delay} seconds before processing next job...")
-                time.sleep(delay)
-                company_name:str = obj['company']
-                obj['company_description'] = search_company(company_name)
-                linkedin_url:str = obj['linkedin_url']
-                obj['job_description'] = retrieve_job_details(linkedin_url)
+        # Jobs that were already analyzed under the current analysis context and have not
+        # changed keep their stored card, so they do not need to be scraped again.
+        new_jobs = [obj for obj in objects if isinstance(obj, dict) and job_index.get_card(obj, analysis_key) is None]
+        metrics.JOBS.inc(len(objects), stage="found")
+        if profile is not None:
+            # Title and location rules only need the search result, so rejected postings
+            # are never scraped.
+            objects, new_jobs = _drop_rejected(objects, new_jobs, *screen_jobs(new_jobs), stage="rules")
+        print(f"Enriching {len(new_jobs)} new or changed jobs concurrently "
+              f"({len(objects) - len(new_jobs)} unchanged)...")
+        metrics.JOBS.inc(len(objects) - len(new_jobs), stage="reused")
+        await enrich_jobs(new_jobs)
+        metrics.JOBS.inc(sum(1 for job in new_jobs if job.get('job_description')), stage="enriched")
+        if profile is not None:
+            # The skill score reads the scraped description, and drops jobs before they reach the model.
+            objects, new_jobs = _drop_rejected(objects, new_jobs, *prefilter_jobs(profile, new_jobs), stage="score")
     return objects
 
 def handle_close_session(state: MessagesState):
@@ -51,7 +72,7 @@ def handle_get_recommended_jobs(state: MessagesState):
     print(state["messages"][-1].content)
     return {"messages": state["messages"]}
 
-def handle_search_jobs(state: MessagesState):
+async def handle_search_jobs(state: MessagesState):
     print("Handling search_jobs output")
     last_message = state["messages"][-1]
     try:
@@ -61,7 +82,10 @@ def handle_search_jobs(state: MessagesState):
         print(f"Tool output for search_jobs is not valid JSON: {last_message.content}")
         return {"messages": state["messages"]}
 
-    detailed_jobs = process_jobs(job_list)
+    # Set by the agent for the run: the context key identifies the profile, prompt and
+    # model behind stored cards, and the profile drives the pre-filter.
+    configurable = get_config().get("configurable", {})
+    detailed_jobs = await process_jobs(job_list, configurable.get("analysis_key"), configurable.get("profile"))
 
     # Update the message content with the modified list.
     last_message.content = json.dumps(detailed_jobs, indent=2)
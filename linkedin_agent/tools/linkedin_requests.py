@@ -1,15 +1,191 @@
+import asyncio
+import json
+import os
+import random
+import threading
+import time
+from contextlib import nullcontext
+
+import httpx
+import lxml.html
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from linkedin_agent.utils.local_store import SqliteCache
+from linkedin_agent.utils.tracing import current_span
+
+# --- LinkedIn Fetch Configuration ---
+LINKEDIN_CONNECT_TIMEOUT = float(os.getenv("LINKEDIN_CONNECT_TIMEOUT", "5"))
+LINKEDIN_READ_TIMEOUT = float(os.getenv("LINKEDIN_READ_TIMEOUT", "20"))
+# Retries for connection errors, 429 and 5xx responses, with exponential backoff (seconds).
+LINKEDIN_MAX_RETRIES = int(os.getenv("LINKEDIN_MAX_RETRIES", "3"))
+LINKEDIN_BACKOFF = float(os.getenv("LINKEDIN_BACKOFF", "1"))
+LINKEDIN_POOL_SIZE = int(os.getenv("LINKEDIN_POOL_SIZE", "10"))
+# Pages that came with an ETag or Last-Modified are revalidated instead of re-downloaded.
+JOB_PAGE_CACHE_TTL_HOURS = float(os.getenv("JOB_PAGE_CACHE_TTL_HOURS", "168"))
+JOB_PAGE_CACHE_MAX_ENTRIES = int(os.getenv("JOB_PAGE_CACHE_MAX_ENTRIES", "5000"))
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+# Longest Retry-After honoured by the async path, in seconds.
+MAX_RETRY_AFTER = 60
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0 Safari/537.36",
+    "Accept-Language": "en-US,en;q=0.9",
+}
+
+# Where the description lives, newest markup first; later entries catch older or
+# logged-in page layouts.
+DESCRIPTION_XPATHS = (
+    "//div[contains(concat(' ', normalize-space(@class), ' '), ' description__text--rich ')]",
+    "//div[contains(concat(' ', normalize-space(@class), ' '), ' show-more-less-html__markup ')]",
+    "//div[@id='job-details']",
+    "//div[contains(concat(' ', normalize-space(@class), ' '), ' jobs-description__content ')]",
+)
+
+# Pages are decoded by httpx/requests; re-encoding as UTF-8 sidesteps lxml's refusal of
+# str input that carries an XML encoding declaration.
+_HTML_PARSER = lxml.html.HTMLParser(encoding="utf-8")
+
+page_cache = SqliteCache(
+    "job_pages",
+    ttl_seconds=JOB_PAGE_CACHE_TTL_HOURS * 3600,
+    max_entries=JOB_PAGE_CACHE_MAX_ENTRIES,
+)
+
+
+def _parse_job_description(html: str) -> str:
+    """
+    Extracts the job description text from a LinkedIn job page, trying each of
+    DESCRIPTION_XPATHS in turn. Raises ValueError if none of them matches.
+    """
+    if not html or not html.strip():
+        raise ValueError("Empty job page.")
+    tree = lxml.html.fromstring(html.encode("utf-8"), parser=_HTML_PARSER)
+    for position, xpath in enumerate(DESCRIPTION_XPATHS):
+        found = tree.xpath(xpath)
+        if found:
+            # A non-zero position means the primary selector no longer matches the markup.
+            current_span().set(selector=position)
+            return found[0].text_content().strip()
+    raise ValueError("No job description found on the page.")
+
+
+def _conditional_headers(url: str):
+    """Returns (cached entry, request headers) for `url`, with validators when the page is cached."""
+    hit, value = page_cache.lookup(url)
+    if not hit or value is None:
+        return None, HEADERS
+    entry = json.loads(value)
+    headers = dict(HEADERS)
+    if entry.get("etag"):
+        headers["If-None-Match"] = entry["etag"]
+    if entry.get("last_modified"):
+        headers["If-Modified-Since"] = entry["last_modified"]
+    return entry, headers
+
+
+def _handle_response(url: str, entry, status: int, headers, text: str, started: float) -> str:
+    """Turns a fetched page (or a 304 for a cached one) into its description, caching it when it can be revalidated."""
+    if status == 304 and entry is not None:
+        # Still current: keep it for another TTL
+        page_cache.set(url, json.dumps(entry))
+        return entry["description"]
+    description = _parse_job_description(text)
+    etag, last_modified = headers.get("etag"), headers.get("last-modified")
+    if etag or last_modified:
+        page_cache.set(url, json.dumps({
+            "etag": etag,
+            "last_modified": last_modified,
+            "description": description,
+        }), miss_seconds=time.monotonic() - started)
+    return description
+
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    """Returns the shared keep-alive session, which retries connection errors, 429 and 5xx with backoff."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            retry = Retry(
+                total=LINKEDIN_MAX_RETRIES,
+                backoff_factor=LINKEDIN_BACKOFF,
+                status_forcelist=RETRY_STATUSES,
+                allowed_methods=frozenset({"GET"}),
+                respect_retry_after_header=True,
+            )
+            adapter = HTTPAdapter(pool_connections=LINKEDIN_POOL_SIZE, pool_maxsize=LINKEDIN_POOL_SIZE, max_retries=retry)
+            session = requests.Session()
+            session.headers.update(HEADERS)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _session = session
+    return _session
 
 
 def retrieve_job_details(url: str) -> str:
-    """Retrieve job details from LinkedIn for a given company."""
-    # In a real implementation, you would search for the company's job postings
-    # and retrieve the relevant job description. Here, we use a placeholder URL.
-    # url = ''
-    response = requests.get(url)
-    soup = BeautifulSoup(response.text, 'html.parser')
-
-    description_div = soup.find('div', class_='description__text description__text--rich')
-    description_text = description_div.get_text()
-    return description_text
+    """Retrieves the job description from a LinkedIn job page."""
+    started = time.monotonic()
+    entry, headers = _conditional_headers(url)
+    response = get_session().get(url, headers=headers, timeout=(LINKEDIN_CONNECT_TIMEOUT, LINKEDIN_READ_TIMEOUT))
+    if response.status_code != 304:
+        response.raise_for_status()
+    return _handle_response(url, entry, response.status_code, response.headers, response.text, started)
+
+
+def _backoff(attempt: int, retry_after=None) -> float:
+    if retry_after is not None:
+        return min(retry_after, MAX_RETRY_AFTER)
+    return LINKEDIN_BACKOFF * 2 ** attempt * random.uniform(0.75, 1.25)
+
+
+async def _get_with_retries(client: httpx.AsyncClient, url: str, headers: dict, throttle=None) -> httpx.Response:
+    """
+    GET with the same retry policy as the sync session: connection errors, 429 and 5xx.
+    With a HostThrottle, every attempt takes its own slot and token, backoff is spent
+    without holding a slot, and a 429 pauses the whole host for the backoff delay.
+    """
+    timeout = httpx.Timeout(LINKEDIN_READ_TIMEOUT, connect=LINKEDIN_CONNECT_TIMEOUT)
+    for attempt in range(LINKEDIN_MAX_RETRIES + 1):
+        async with throttle.slot(url) if throttle is not None else nullcontext():
+            try:
+                response = await client.get(url, headers=headers, timeout=timeout)
+            except httpx.TransportError:
+                if attempt == LINKEDIN_MAX_RETRIES:
+                    raise
+                response = None
+        if response is None:
+            delay = _backoff(attempt)
+        elif response.status_code not in RETRY_STATUSES or attempt == LINKEDIN_MAX_RETRIES:
+            return response
+        else:
+            try:
+                retry_after = float(response.headers.get("retry-after"))
+            except (TypeError, ValueError):
+                retry_after = None
+            delay = _backoff(attempt, retry_after)
+            if response.status_code == 429 and throttle is not None:
+                throttle.defer(url, delay)
+        current_span().add("retries", 1)
+        await asyncio.sleep(delay)
+
+
+async def retrieve_job_details_async(client: httpx.AsyncClient, url: str, throttle=None) -> str:
+    """
+    Async variant of retrieve_job_details that runs on a shared httpx client, paced
+    per attempt by `throttle` (an enrichment HostThrottle) when given.
+    """
+    started = time.monotonic()
+    entry, headers = _conditional_headers(url)
+    response = await _get_with_retries(client, url, headers, throttle)
+    current_span().set(bytes=len(response.content), status=response.status_code)
+    if response.status_code != 304:
+        response.raise_for_status()
+    # Parsing is CPU bound, keep it off the event loop.
+    return await asyncio.to_thread(
+        _handle_response, url, entry, response.status_code, response.headers, response.text, started
+    )
@@ -1,19 +1,83 @@
 import os
+import re
+import time
+import httpx
 import requests
 from langchain_core.tools import tool
 
+from linkedin_agent.utils.local_store import SqliteCache, make_key
+from linkedin_agent.utils.tracing import current_span
+
 TAVILY_API_KEY = os.getenv("TAVILY_API_KEY")
+TAVILY_SEARCH_URL = "https://api.tavily.com/search"
+
+# --- Company Cache Configuration ---
+COMPANY_CACHE_TTL_HOURS = float(os.getenv("COMPANY_CACHE_TTL_HOURS", "720"))
+COMPANY_CACHE_NEGATIVE_TTL_HOURS = float(os.getenv("COMPANY_CACHE_NEGATIVE_TTL_HOURS", "24"))
+COMPANY_CACHE_MAX_ENTRIES = int(os.getenv("COMPANY_CACHE_MAX_ENTRIES", "5000"))
+
+company_cache = SqliteCache(
+    "company",
+    ttl_seconds=COMPANY_CACHE_TTL_HOURS * 3600,
+    negative_ttl_seconds=COMPANY_CACHE_NEGATIVE_TTL_HOURS * 3600,
+    max_entries=COMPANY_CACHE_MAX_ENTRIES,
+)
+
+
+def normalize_company_name(name: str) -> str:
+    """Normalizes a company name so 'ACME, Inc.' and 'acme inc' share a cache entry."""
+    name = re.sub(r"[^\w\s&]", " ", name.casefold())
+    return " ".join(name.split())
+
+
+def _company_search_payload(query: str) -> dict:
+    """Builds the Tavily request body used for company lookups."""
+    return {"query": f"who are {query} as a company", "max_results": 1, "include_answer": "advanced"}
+
+
+def _store_answer(query: str, answer, started: float):
+    """Caches a Tavily answer; an empty answer is cached as a negative result."""
+    key = make_key(normalize_company_name(query))
+    company_cache.set(key, answer, negative=not answer, miss_seconds=time.monotonic() - started)
+
+
+def lookup_company(query: str):
+    """Returns (hit, answer) from the company cache without touching the network."""
+    return company_cache.lookup(make_key(normalize_company_name(query)))
+
 
 # --- Tool definition ---
 @tool
 def search_company(query: str) -> str:
     """Search Tavily for information about a company."""
+    hit, answer = lookup_company(query)
+    if hit:
+        return answer
+
+    started = time.monotonic()
     resp = requests.post(
-        "https://api.tavily.com/search",
+        TAVILY_SEARCH_URL,
         headers={"Authorization": f"Bearer {TAVILY_API_KEY}"},
-        json={"query": f"who are {query} as a company", "max_results": 1, "include_answer": "advanced"}
+        json=_company_search_payload(query)
     )
     resp.raise_for_status()
     data = resp.json()
-    return data['answer']
+    _store_answer(query, data.get('answer'), started)
+    return data.get('answer')
     # return "\n".join([r["content"] for r in data.get("results", [])])
+
+
+async def fetch_company_async(client: httpx.AsyncClient, query: str) -> str:
+    """Queries Tavily on a shared httpx client and stores the answer in the cache."""
+    started = time.monotonic()
+    resp = await client.post(
+        TAVILY_SEARCH_URL,
+        headers={"Authorization": f"Bearer {TAVILY_API_KEY}"},
+        json=_company_search_payload(query)
+    )
+    resp.raise_for_status()
+    current_span().set(bytes=len(resp.content))
+    data = resp.json()
+    _store_answer(query, data.get('answer'), started)
+    return data.get('answer')
+
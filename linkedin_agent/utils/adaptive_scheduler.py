@@ -0,0 +1,164 @@
+import asyncio
+import random
+import time
+
+from linkedin_agent.utils import metrics
+from linkedin_agent.utils.tracing import span
+
+# Exception class names that mean "slow down and try again" across the
+# OpenAI, Anthropic, httpx and asyncio stacks, so no provider SDK is imported here.
+_RATE_LIMIT_ERRORS = {"RateLimitError", "TooManyRequests"}
+_TIMEOUT_ERRORS = {"TimeoutError", "APITimeoutError", "ReadTimeout", "ConnectTimeout", "PoolTimeout", "TimeoutException"}
+
+
+def classify_error(error: Exception):
+    """Returns 'rate_limit', 'timeout' or None for errors that should not be retried."""
+    name = type(error).__name__
+    status = getattr(error, "status_code", None) or getattr(getattr(error, "response", None), "status_code", None)
+    if name in _RATE_LIMIT_ERRORS or status == 429:
+        return "rate_limit"
+    if name in _TIMEOUT_ERRORS or isinstance(error, asyncio.TimeoutError) or status in (408, 504):
+        return "timeout"
+    return None
+
+
+def _retry_after(error: Exception):
+    """Reads a Retry-After header (in seconds) from the error's HTTP response, if any."""
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+class AdaptiveScheduler:
+    """
+    Runs coroutine factories under an AIMD concurrency window.
+
+    The window grows by one slot per window of successful requests and is
+    multiplied by `decrease` whenever the provider rate limits or times out.
+    Throttled requests are retried with jittered exponential backoff, and
+    every attempt is bounded by `deadline` seconds.
+    """
+
+    def __init__(
+        self,
+        initial_concurrency: int = 4,
+        min_concurrency: int = 1,
+        max_concurrency: int = 16,
+        decrease: float = 0.5,
+        max_retries: int = 4,
+        base_delay: float = 1.0,
+        max_delay: float = 30.0,
+        deadline: float = 120.0,
+        span_name: str = "scheduler.task",
+    ):
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self.decrease = decrease
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline = deadline
+        self.span_name = span_name
+        self._window = float(max(min_concurrency, min(initial_concurrency, max_concurrency)))
+        self._in_flight = 0
+        self._waiting = 0
+        self._cond = None
+        self._started = None
+        self._stats = {"completed": 0, "failed": 0, "retries": 0, "rate_limited": 0, "timeouts": 0}
+
+    def _publish(self):
+        """Exports the live queue state; called with the condition held whenever it changes."""
+        metrics.SCHEDULER_IN_FLIGHT.set(self._in_flight, scheduler=self.span_name)
+        metrics.SCHEDULER_WAITING.set(self._waiting, scheduler=self.span_name)
+        metrics.SCHEDULER_WINDOW.set(round(self._window, 2), scheduler=self.span_name)
+
+    async def _acquire(self):
+        async with self._cond:
+            self._waiting += 1
+            self._publish()
+            await self._cond.wait_for(lambda: self._in_flight < int(self._window))
+            self._waiting -= 1
+            self._in_flight += 1
+            self._publish()
+
+    async def _release(self, outcome: str = None):
+        async with self._cond:
+            self._in_flight -= 1
+            if outcome in ("rate_limit", "timeout"):
+                self._window = max(self.min_concurrency, self._window * self.decrease)
+            elif outcome == "success":
+                self._window = min(self.max_concurrency, self._window + 1 / self._window)
+            self._publish()
+            self._cond.notify_all()
+
+    async def _run_one(self, factory):
+        with span(self.span_name) as task_span:
+            return await self._attempt(factory, task_span)
+
+    async def _attempt(self, factory, task_span):
+        attempt = 0
+        while True:
+            await self._acquire()
+            try:
+                result = await asyncio.wait_for(factory(), self.deadline)
+            except Exception as e:
+                kind = classify_error(e)
+                await self._release(kind)
+                if kind == "rate_limit":
+                    self._stats["rate_limited"] += 1
+                elif kind == "timeout":
+                    self._stats["timeouts"] += 1
+                if kind is None or attempt >= self.max_retries:
+                    self._stats["failed"] += 1
+                    raise
+                # Full jitter backoff, but never sooner than the provider asked for.
+                delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+                delay = max(delay, _retry_after(e) or 0)
+                attempt += 1
+                self._stats["retries"] += 1
+                task_span.add("retries")
+                task_span.add("wait_ms", round(delay * 1000))
+                await asyncio.sleep(delay)
+                continue
+            await self._release("success")
+            self._stats["completed"] += 1
+            return result
+
+    async def run(self, factories: list, on_done=None) -> list:
+        """
+        Runs every factory (a zero-argument callable returning a coroutine) and
+        returns their results in order. Failures are returned as exceptions.
+        `on_done(position, result)` is called as each factory finishes.
+        """
+        self._cond = asyncio.Condition()
+        if self._started is None:
+            self._started = time.monotonic()
+
+        async def run_one(position: int, factory):
+            try:
+                result = await self._run_one(factory)
+            except Exception as e:
+                result = e
+            if on_done is not None:
+                on_done(position, result)
+            return result
+
+        return await asyncio.gather(*(run_one(n, f) for n, f in enumerate(factories)), return_exceptions=True)
+
+    def stats(self) -> dict:
+        """
+        Returns throughput, queue depth and retry counters for the current run. The live
+        in-flight and waiting counts are exported as the scheduler_* gauges.
+        """
+        elapsed = time.monotonic() - self._started if self._started else 0.0
+        stats = dict(self._stats)
+        stats.update({
+            "window": round(self._window, 2),
+            "in_flight": self._in_flight,
+            "queue_depth": self._waiting,
+            "elapsed_seconds": round(elapsed, 2),
+            "jobs_per_second": round(stats["completed"] / elapsed, 3) if elapsed else 0.0,
+        })
+        return stats
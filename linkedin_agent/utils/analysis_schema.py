@@ -0,0 +1,162 @@
+import json
+import math
+import re
+from itertools import islice
+from typing import List, Optional
+
+import orjson
+from pydantic import BaseModel, ConfigDict, Field, ValidationError, field_validator
+
+NOT_SPECIFIED = "Not specified"
+# Brackets tried as the start of the JSON value before giving up on a malformed answer.
+MAX_DECODE_ATTEMPTS = 20
+
+_FENCE = re.compile(r"```(?:json|JSON)?\s*(.*?)```", re.DOTALL)
+_decoder = json.JSONDecoder()
+
+
+class MatchingSkill(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+
+    skill: str
+    proficiency: Optional[str] = Field("", description="Expert, Proficient, or Intermediate, as listed in the profile")
+    reason: Optional[str] = ""
+
+
+class MissingSkill(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+
+    skill: str
+    reason: Optional[str] = ""
+
+
+def _skill_items(value):
+    # Models sometimes list bare skill names instead of objects, or send null for no skills.
+    if value is None:
+        return []
+    if isinstance(value, list):
+        return [{"skill": item} if isinstance(item, str) else item for item in value]
+    return value
+
+
+def _scalar_text(value):
+    # Numbers and booleans in text fields are rendered as they are; other types fail validation.
+    if isinstance(value, (int, float)):
+        return str(value)
+    return value
+
+
+class JobAnalysis(BaseModel):
+    """
+    The analysis contract shared by the single-job and batch prompts, and the schema
+    bound to the model in structured-output mode. Only fitScore is required: missing
+    names and skill lists get defaults, numbers in text fields (e.g. a salary of
+    120000) are kept as text, and optional fields may come back as null, in which
+    case the renderer falls back to its defaults.
+    """
+
+    model_config = ConfigDict(extra="ignore")
+
+    companyName: str = NOT_SPECIFIED
+    jobTitle: str = NOT_SPECIFIED
+    fitScore: int = Field(description="Overall fit between 0 and 100")
+    matchingSkills: List[MatchingSkill] = Field(default_factory=list, description="Job requirements the profile covers")
+    missingSkills: List[MissingSkill] = Field(default_factory=list, description="Job requirements the profile lacks")
+    location: Optional[str] = NOT_SPECIFIED
+    workType: Optional[str] = Field(NOT_SPECIFIED, description="Onsite, Remote, or Hybrid")
+    workTypeEmoji: Optional[str] = "❓"
+    salary: Optional[str] = NOT_SPECIFIED
+    fitReasoning: Optional[str] = ""
+    notes: Optional[str] = ""
+    companyDescription: Optional[str] = ""
+    linkedinUrl: Optional[str] = "#"
+
+    @field_validator("fitScore", mode="before")
+    @classmethod
+    def _score(cls, value):
+        # Numbers and numeric strings such as "85%" are accepted; anything else,
+        # including null, booleans and non-finite values, fails validation.
+        if isinstance(value, bool) or not isinstance(value, (int, float, str)):
+            raise ValueError(f"fitScore must be a number, got {type(value).__name__}")
+        if isinstance(value, str):
+            value = value.strip().rstrip("%")
+        try:
+            score = float(value)
+        except OverflowError:
+            score = math.inf
+        if not math.isfinite(score):
+            raise ValueError("fitScore must be finite")
+        return max(0, min(100, round(score)))
+
+    @field_validator("companyName", "jobTitle", mode="before")
+    @classmethod
+    def _name(cls, value):
+        if value is None:
+            return NOT_SPECIFIED
+        return _scalar_text(value)
+
+    @field_validator(
+        "location", "workType", "workTypeEmoji", "salary", "fitReasoning",
+        "notes", "companyDescription", "linkedinUrl", mode="before",
+    )
+    @classmethod
+    def _text(cls, value):
+        return _scalar_text(value)
+
+    @field_validator("matchingSkills", "missingSkills", mode="before")
+    @classmethod
+    def _skills(cls, value):
+        return _skill_items(value)
+
+
+def extract_json(text):
+    """
+    Returns the JSON value in a model answer, tolerating markdown fences and text
+    before or after it, or None if there is none. Well-formed output takes the fast path.
+    """
+    if not isinstance(text, (str, bytes)):
+        return None
+    try:
+        return orjson.loads(text)
+    except orjson.JSONDecodeError:
+        pass
+    if isinstance(text, bytes):
+        text = text.decode("utf-8", errors="replace")
+
+    fence = _FENCE.search(text)
+    if fence:
+        try:
+            return orjson.loads(fence.group(1))
+        except orjson.JSONDecodeError:
+            text = fence.group(1)
+
+    # Decode from the first bracket that starts a complete value; trailing text is ignored.
+    starts = (n for n, char in enumerate(text) if char in "{[")
+    for start in islice(starts, MAX_DECODE_ATTEMPTS):
+        try:
+            return _decoder.raw_decode(text, start)[0]
+        except json.JSONDecodeError:
+            continue
+    return None
+
+
+def validate_analysis(data):
+    """Validates an already decoded analysis object, returning None if it does not fit the schema."""
+    if not isinstance(data, dict):
+        return None
+    try:
+        return JobAnalysis.model_validate(data)
+    except ValidationError:
+        return None
+
+
+def parse_analysis(text):
+    """Extracts and validates a JobAnalysis from raw model text, or returns None."""
+    if isinstance(text, JobAnalysis):
+        return text
+    return validate_analysis(extract_json(text))
+
+
+def dump_analysis(analysis: JobAnalysis) -> str:
+    """Serializes a validated analysis to compact canonical JSON, e.g. for the cache."""
+    return orjson.dumps(analysis.model_dump()).decode("utf-8")
@@ -0,0 +1,55 @@
+import asyncio
+import threading
+
+
+class BackgroundLoop:
+    """
+    A single asyncio event loop running forever in a dedicated daemon thread.
+    Async resources (HTTP pools, MCP clients, caches) created on it live for the
+    whole process, and other threads hand it work as coroutines.
+    """
+
+    def __init__(self, name: str = "agent-loop"):
+        self.name = name
+        self.loop = asyncio.new_event_loop()
+        self._thread = None
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def start(self):
+        """Starts the loop thread (idempotent)."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+        return self
+
+    def submit(self, coro):
+        """Schedules a coroutine on the loop and returns a concurrent.futures.Future."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro, timeout: float = None):
+        """Runs a coroutine on the loop and blocks the calling thread until it finishes."""
+        return self.submit(coro).result(timeout)
+
+    def call_soon(self, callback, *args):
+        """Runs a plain callable on the loop thread."""
+        self.loop.call_soon_threadsafe(callback, *args)
+
+    async def _cancel_tasks(self):
+        tasks = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stop(self, timeout: float = 30):
+        """Cancels outstanding tasks, stops the loop and joins its thread."""
+        if self._thread is None or not self.loop.is_running():
+            return
+        try:
+            self.run(self._cancel_tasks(), timeout)
+        finally:
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self._thread.join(timeout)
+            self._thread = None
@@ -0,0 +1,142 @@
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from datetime import datetime, timezone
+
+import zstandard
+
+# Where the agent worker publishes the feed and the web processes read it from.
+RSS_FILE = "rss.xml"
+
+# Content encodings written next to the feed at publish time, by file suffix.
+ENCODINGS = {"gzip": ".gz", "zstd": ".zst"}
+
+
+class Feed:
+    """One published generation of the feed, held in memory with all its encodings."""
+
+    def __init__(self, etag: str, last_modified: float, bodies: dict):
+        self.etag = etag
+        self.last_modified = datetime.fromtimestamp(int(last_modified), tz=timezone.utc)
+        self.bodies = bodies
+
+    def etag_for(self, encoding: str) -> str:
+        """Each encoding is a different representation, so it gets its own strong ETag."""
+        return self.etag if encoding == "identity" else f"{self.etag}-{encoding}"
+
+
+def _meta_path(path: str) -> str:
+    return f"{path}.meta.json"
+
+
+def _write_atomic(path: str, data: bytes):
+    """Writes through a temp file and os.replace, so readers never see a partial file."""
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def _etag(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()[:32]
+
+
+def _compress(data: bytes) -> dict:
+    return {
+        "gzip": gzip.compress(data, compresslevel=9, mtime=0),
+        "zstd": zstandard.ZstdCompressor(level=19).compress(data),
+    }
+
+
+def publish_feed(path: str, data: bytes) -> dict:
+    """
+    Writes the feed plus gzip/zstd variants and a metadata file with its ETag and
+    Last-Modified. The metadata is written last, which makes the generation visible.
+    Identical content is not rewritten, so Last-Modified only moves when the feed changes.
+    """
+    etag = _etag(data)
+    current = _read(_meta_path(path))
+    if current is not None and _read(path) == data:
+        meta = json.loads(current)
+        if meta.get("etag") == etag:
+            return meta
+
+    variants = _compress(data)
+    _write_atomic(path, data)
+    for encoding, suffix in ENCODINGS.items():
+        _write_atomic(path + suffix, variants[encoding])
+
+    meta = {
+        "etag": etag,
+        "last_modified": time.time(),
+        "sizes": {"identity": len(data), **{encoding: len(body) for encoding, body in variants.items()}},
+    }
+    _write_atomic(_meta_path(path), json.dumps(meta).encode("utf-8"))
+    return meta
+
+
+_cache_lock = threading.Lock()
+_cache = {}
+
+
+def _read(path: str):
+    try:
+        with open(path, "rb") as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+
+def _load_published(path: str):
+    """Reads a generation written by publish_feed, or None if it is missing or mid-publish."""
+    meta_bytes = _read(_meta_path(path))
+    data = _read(path)
+    if meta_bytes is None or data is None:
+        return None
+    meta = json.loads(meta_bytes)
+    if _etag(data) != meta["etag"]:
+        return None
+    bodies = {"identity": data}
+    for encoding, suffix in ENCODINGS.items():
+        body = _read(path + suffix)
+        if body is not None and len(body) == meta["sizes"].get(encoding):
+            bodies[encoding] = body
+    return Feed(meta["etag"], meta["last_modified"], bodies)
+
+
+def _load_legacy(path: str):
+    """Wraps a feed file written without metadata, compressing it in memory."""
+    data = _read(path)
+    if data is None:
+        return None
+    return Feed(_etag(data), os.path.getmtime(path), {"identity": data, **_compress(data)})
+
+
+def load_feed(path: str):
+    """
+    Returns the current Feed for `path`, or None if no feed exists yet. Files are read
+    once per generation; later calls only stat the metadata file.
+    """
+    try:
+        stamp = os.stat(_meta_path(path)).st_mtime_ns
+    except FileNotFoundError:
+        try:
+            stamp = ("legacy", os.stat(path).st_mtime_ns)
+        except FileNotFoundError:
+            return None
+
+    with _cache_lock:
+        cached = _cache.get(path)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+
+    feed = _load_published(path) if not isinstance(stamp, tuple) else _load_legacy(path)
+    if feed is None:
+        # A publish is in progress; keep serving the previous generation until it finishes.
+        return cached[1] if cached is not None else None
+    with _cache_lock:
+        _cache[path] = (stamp, feed)
+    return feed
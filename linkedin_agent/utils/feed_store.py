@@ -0,0 +1,96 @@
+import os
+import threading
+import time
+import uuid
+
+from linkedin_agent.utils.local_store import get_connection
+
+# --- Feed Store Configuration ---
+# Number of most recently published entries kept in the feed.
+FEED_MAX_ENTRIES = int(os.getenv("FEED_MAX_ENTRIES", "200"))
+
+_schema_lock = threading.Lock()
+_schema_ready = False
+
+
+def _conn():
+    global _schema_ready
+    conn = get_connection()
+    if not _schema_ready:
+        with _schema_lock:
+            conn.execute("""
+            CREATE TABLE IF NOT EXISTS feed_entries (
+                job_key TEXT PRIMARY KEY,
+                job_title TEXT,
+                job_html TEXT NOT NULL,
+                link TEXT,
+                published REAL NOT NULL,
+                updated REAL NOT NULL
+            )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_feed_published ON feed_entries (published)")
+            _schema_ready = True
+    return conn
+
+
+def entry_id(job_key: str) -> str:
+    """Derives a stable Atom entry ID from the job key, so readers never see a job twice."""
+    return f"urn:uuid:{uuid.uuid5(uuid.NAMESPACE_URL, job_key)}"
+
+
+def merge_entries(entries: list) -> dict:
+    """
+    Merges analyzed jobs ({job_id, job_title, job_html, linkedin_url}) into the store.
+    New jobs are published now, changed cards only bump `updated`, unchanged ones are
+    left alone. Entries without a job_id (failed analyses) are skipped. Entries beyond
+    the newest FEED_MAX_ENTRIES are dropped.
+    """
+    conn = _conn()
+    now = time.time()
+    counts = {"added": 0, "updated": 0, "unchanged": 0, "expired": 0}
+    for entry in entries:
+        key = entry.get("job_id")
+        if not key:
+            continue
+        row = conn.execute("SELECT job_html FROM feed_entries WHERE job_key = ?", (key,)).fetchone()
+        if row is None:
+            conn.execute(
+                "INSERT INTO feed_entries (job_key, job_title, job_html, link, published, updated) VALUES (?, ?, ?, ?, ?, ?)",
+                (key, entry.get("job_title"), entry.get("job_html", ""), entry.get("linkedin_url"), now, now)
+            )
+            counts["added"] += 1
+        elif row[0] != entry.get("job_html", ""):
+            conn.execute(
+                "UPDATE feed_entries SET job_title = ?, job_html = ?, link = ?, updated = ? WHERE job_key = ?",
+                (entry.get("job_title"), entry.get("job_html", ""), entry.get("linkedin_url"), now, key)
+            )
+            counts["updated"] += 1
+        else:
+            counts["unchanged"] += 1
+
+    counts["expired"] = conn.execute(
+        "DELETE FROM feed_entries WHERE job_key IN ("
+        " SELECT job_key FROM feed_entries ORDER BY published DESC, job_key DESC LIMIT -1 OFFSET ?)",
+        (FEED_MAX_ENTRIES,)
+    ).rowcount
+    return counts
+
+
+def recent_entries(limit: int = None) -> list:
+    """Returns the stored entries, newest first, with their stable entry IDs."""
+    rows = _conn().execute(
+        "SELECT job_key, job_title, job_html, link, published, updated FROM feed_entries "
+        "ORDER BY published DESC, job_key DESC LIMIT ?",
+        (limit or FEED_MAX_ENTRIES,)
+    ).fetchall()
+    return [
+        {
+            "id": entry_id(key),
+            "job_title": title,
+            "job_html": html,
+            "link": link,
+            "published": published,
+            "updated": updated,
+        }
+        for key, title, html, link, published, updated in rows
+    ]
@@ -0,0 +1,109 @@
+import json
+import os
+import re
+import threading
+import time
+
+from linkedin_agent.utils.local_store import get_connection, make_key
+
+# --- Job Index Configuration ---
+# Stored cards not seen in a search for this long are dropped, as are the least
+# recently seen entries beyond JOB_INDEX_MAX_ENTRIES.
+JOB_INDEX_TTL_DAYS = float(os.getenv("JOB_INDEX_TTL_DAYS", "90"))
+JOB_INDEX_MAX_ENTRIES = int(os.getenv("JOB_INDEX_MAX_ENTRIES", "5000"))
+
+# Fields that are filled in by enrichment or change between searches without
+# the posting itself changing. They are left out of the content hash.
+VOLATILE_FIELDS = {"company_description", "job_description", "applicant_count", "posted_date"}
+
+_LINKEDIN_JOB_ID = re.compile(r"(?:/jobs/view/(?:[^/?#]*-)?|currentJobId=)(\d+)")
+
+_schema_lock = threading.Lock()
+_schema_ready = False
+
+
+def _conn():
+    global _schema_ready
+    conn = get_connection()
+    if not _schema_ready:
+        with _schema_lock:
+            conn.execute("""
+            CREATE TABLE IF NOT EXISTS job_index (
+                job_key TEXT PRIMARY KEY,
+                content_hash TEXT NOT NULL,
+                job_title TEXT,
+                job_html TEXT NOT NULL,
+                first_seen REAL NOT NULL,
+                last_seen REAL NOT NULL,
+                analysis_key TEXT
+            )
+            """)
+            # Tables created before cards were tied to an analysis context lack the column;
+            # their rows never match and are re-analyzed once.
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(job_index)")}
+            if "analysis_key" not in columns:
+                conn.execute("ALTER TABLE job_index ADD COLUMN analysis_key TEXT")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_job_index_last_seen ON job_index (last_seen)")
+            _schema_ready = True
+    return conn
+
+
+def job_key(job: dict) -> str:
+    """Returns a stable key for a job: the LinkedIn job ID, else its URL, else title and company."""
+    url = job.get("linkedin_url") or ""
+    match = _LINKEDIN_JOB_ID.search(url)
+    if match:
+        return f"linkedin:{match.group(1)}"
+    if url and url != "...":
+        return f"url:{url.split('?')[0]}"
+    return "job:" + make_key(str(job.get("company", "")), str(job.get("job_title", "")), str(job.get("location", "")))
+
+
+def job_content_hash(job: dict) -> str:
+    """Hashes the search payload of a job, ignoring enrichment and volatile fields."""
+    payload = {k: v for k, v in job.items() if k not in VOLATILE_FIELDS}
+    return make_key(json.dumps(payload, sort_keys=True, default=str))
+
+
+def get_card(job: dict, analysis_key: str):
+    """
+    Returns the stored rendered card for an unchanged job analyzed under the same
+    `analysis_key` (profile, prompt, model and cache version), or None if the job is
+    new, changed, expired or was analyzed under a different context.
+    """
+    if not analysis_key:
+        return None
+    key = job_key(job)
+    conn = _conn()
+    now = time.time()
+    row = conn.execute(
+        "SELECT content_hash, job_html, analysis_key, last_seen FROM job_index WHERE job_key = ?", (key,)
+    ).fetchone()
+    if (
+        row is None
+        or row[0] != job_content_hash(job)
+        or row[2] != analysis_key
+        or row[3] < now - JOB_INDEX_TTL_DAYS * 86400
+    ):
+        return None
+    conn.execute("UPDATE job_index SET last_seen = ? WHERE job_key = ?", (now, key))
+    return row[1]
+
+
+def record_card(job: dict, job_title: str, job_html: str, analysis_key: str):
+    """Stores the rendered card of a successfully analyzed job and prunes old entries."""
+    now = time.time()
+    conn = _conn()
+    conn.execute(
+        "INSERT INTO job_index (job_key, content_hash, job_title, job_html, first_seen, last_seen, analysis_key) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?) "
+        "ON CONFLICT(job_key) DO UPDATE SET content_hash = excluded.content_hash, job_title = excluded.job_title, "
+        "job_html = excluded.job_html, last_seen = excluded.last_seen, analysis_key = excluded.analysis_key",
+        (job_key(job), job_content_hash(job), job_title, job_html, now, now, analysis_key)
+    )
+    conn.execute("DELETE FROM job_index WHERE last_seen < ?", (now - JOB_INDEX_TTL_DAYS * 86400,))
+    conn.execute(
+        "DELETE FROM job_index WHERE job_key IN ("
+        " SELECT job_key FROM job_index ORDER BY last_seen DESC LIMIT -1 OFFSET ?)",
+        (JOB_INDEX_MAX_ENTRIES,)
+    )
@@ -0,0 +1,147 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from dotenv import load_dotenv
+
+# Load environment variables from .env file
+load_dotenv()
+
+# --- Local Store Configuration ---
+# A single SQLite file holds the agent's local caches and indexes.
+LOCAL_DB_PATH = os.getenv("LOCAL_DB_PATH", "agent_cache.db")
+
+# SQLite connections cannot be shared across threads, so keep one per thread.
+_thread_local = threading.local()
+
+
+def get_connection() -> sqlite3.Connection:
+    """Returns this thread's connection to the local SQLite store."""
+    conn = getattr(_thread_local, "conn", None)
+    if conn is None:
+        conn = sqlite3.connect(LOCAL_DB_PATH, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        _thread_local.conn = conn
+    return conn
+
+
+def make_key(*parts: str) -> str:
+    """Builds a content-addressed key from the given parts."""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+
+class SqliteCache:
+    """
+    A persistent key/value cache with TTL, LRU eviction and negative-result caching.
+    Several caches share one table, separated by `namespace`.
+    """
+
+    _schema_lock = threading.Lock()
+    _schema_ready = set()
+    # Every cache created in this process, by namespace, so their stats can be exported.
+    instances = {}
+
+    def __init__(self, namespace: str, ttl_seconds: float, max_entries: int, negative_ttl_seconds: float = None):
+        self.namespace = namespace
+        self.ttl_seconds = ttl_seconds
+        self.negative_ttl_seconds = ttl_seconds if negative_ttl_seconds is None else negative_ttl_seconds
+        self.max_entries = max_entries
+        self._stats_lock = threading.Lock()
+        self._stats = {"hits": 0, "negative_hits": 0, "misses": 0, "sets": 0, "evictions": 0, "miss_seconds": 0.0}
+        SqliteCache.instances[namespace] = self
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = get_connection()
+        if LOCAL_DB_PATH not in SqliteCache._schema_ready:
+            with SqliteCache._schema_lock:
+                conn.execute("""
+                CREATE TABLE IF NOT EXISTS cache_entries (
+                    namespace TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    value TEXT,
+                    is_negative INTEGER NOT NULL DEFAULT 0,
+                    created_at REAL NOT NULL,
+                    expires_at REAL NOT NULL,
+                    last_access REAL NOT NULL,
+                    PRIMARY KEY (namespace, key)
+                )
+                """)
+                conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_lru ON cache_entries (namespace, last_access)")
+                SqliteCache._schema_ready.add(LOCAL_DB_PATH)
+        return conn
+
+    def _count(self, stat: str, amount=1):
+        with self._stats_lock:
+            self._stats[stat] += amount
+
+    def lookup(self, key: str):
+        """
+        Returns (hit, value). A cached negative result is a hit with value None.
+        """
+        conn = self._conn()
+        now = time.time()
+        row = conn.execute(
+            "SELECT value, is_negative, expires_at FROM cache_entries WHERE namespace = ? AND key = ?",
+            (self.namespace, key)
+        ).fetchone()
+        if row is None or row[2] < now:
+            if row is not None:
+                conn.execute("DELETE FROM cache_entries WHERE namespace = ? AND key = ?", (self.namespace, key))
+            self._count("misses")
+            return False, None
+
+        conn.execute(
+            "UPDATE cache_entries SET last_access = ? WHERE namespace = ? AND key = ?",
+            (now, self.namespace, key)
+        )
+        if row[1]:
+            self._count("negative_hits")
+            return True, None
+        self._count("hits")
+        return True, row[0]
+
+    def set(self, key: str, value: str = None, negative: bool = False, miss_seconds: float = 0.0):
+        """
+        Stores a value (or a negative result) and evicts least recently used entries.
+        `miss_seconds` is the time the uncached call took, used to estimate savings.
+        """
+        conn = self._conn()
+        now = time.time()
+        ttl = self.negative_ttl_seconds if negative else self.ttl_seconds
+        conn.execute(
+            "INSERT OR REPLACE INTO cache_entries (namespace, key, value, is_negative, created_at, expires_at, last_access) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (self.namespace, key, None if negative else value, int(negative), now, now + ttl, now)
+        )
+        evicted = conn.execute(
+            "DELETE FROM cache_entries WHERE namespace = ? AND key IN ("
+            " SELECT key FROM cache_entries WHERE namespace = ? ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+            (self.namespace, self.namespace, self.max_entries)
+        ).rowcount
+        self._count("sets")
+        self._count("miss_seconds", miss_seconds)
+        if evicted:
+            self._count("evictions", evicted)
+
+    def clear(self):
+        """Removes every entry in this cache's namespace."""
+        self._conn().execute("DELETE FROM cache_entries WHERE namespace = ?", (self.namespace,))
+
+    def stats(self) -> dict:
+        """Returns hit/miss counters and the estimated time saved by cache hits."""
+        with self._stats_lock:
+            stats = dict(self._stats)
+        hits = stats["hits"] + stats["negative_hits"]
+        lookups = hits + stats["misses"]
+        avg_miss_seconds = stats["miss_seconds"] / stats["sets"] if stats["sets"] else 0.0
+        stats["hit_ratio"] = round(hits / lookups, 3) if lookups else 0.0
+        stats["requests_saved"] = hits
+        stats["estimated_seconds_saved"] = round(hits * avg_miss_seconds, 2)
+        stats["miss_seconds"] = round(stats["miss_seconds"], 2)
+        return stats
@@ -0,0 +1,89 @@
+import json
+import os
+import threading
+from datetime import datetime
+
+import zstandard
+
+
+class LogSpool:
+    """
+    An append-only local file of log rows kept while the database is unreachable.
+    Rows are stored as JSON lines; with `compress` every append is written as its
+    own zstd frame, so the file stays appendable and is read back across frames.
+    """
+
+    def __init__(self, path: str, compress: bool = False):
+        self.path = path + ".zst" if compress and not path.endswith(".zst") else path
+        self.compress = compress
+        self.replay_path = self.path + ".replaying"
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _encode(rows) -> bytes:
+        lines = []
+        for timestamp, *fields in rows:
+            lines.append(json.dumps([timestamp.isoformat(), *fields]))
+        return ("\n".join(lines) + "\n").encode("utf-8")
+
+    def append(self, rows):
+        """Appends rows of (timestamp, run_id, level, source, message, details_json)."""
+        if not rows:
+            return
+        data = self._encode(rows)
+        if self.compress:
+            data = zstandard.ZstdCompressor().compress(data)
+        with self._lock:
+            with open(self.path, "ab") as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+
+    def size(self) -> int:
+        """Returns the current size of the spool file in bytes."""
+        try:
+            return os.path.getsize(self.path)
+        except OSError:
+            return 0
+
+    def has_entries(self) -> bool:
+        return os.path.exists(self.replay_path) or (os.path.exists(self.path) and os.path.getsize(self.path) > 0)
+
+    def _read(self, path: str) -> list:
+        with open(path, "rb") as f:
+            if self.compress:
+                with zstandard.ZstdDecompressor().stream_reader(f, read_across_frames=True) as reader:
+                    data = reader.read()
+            else:
+                data = f.read()
+        rows = []
+        for line in data.decode("utf-8").splitlines():
+            try:
+                timestamp, *fields = json.loads(line)
+                timestamp = datetime.fromisoformat(timestamp)
+            except (ValueError, TypeError):
+                continue # A torn write at the end of the file
+            if len(fields) == 4:
+                fields.insert(0, None) # Spooled before rows carried a run_id
+            rows.append((timestamp, *fields))
+        return rows
+
+    def take(self) -> list:
+        """
+        Moves the spool aside and returns its rows for replay. A replay file left by an
+        interrupted replay is picked up first. Call `done()` once the rows are stored.
+        """
+        with self._lock:
+            if not os.path.exists(self.replay_path):
+                if not os.path.exists(self.path):
+                    return []
+                os.replace(self.path, self.replay_path)
+        return self._read(self.replay_path)
+
+    def done(self, remaining=None):
+        """Finishes a replay; rows that could not be written go back into the spool."""
+        if remaining:
+            self.append(remaining)
+        with self._lock:
+            if os.path.exists(self.replay_path):
+                os.remove(self.replay_path)
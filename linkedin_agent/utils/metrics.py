@@ -0,0 +1,225 @@
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# The agent worker writes its metrics here every SNAPSHOT_SECONDS for the web processes
+SNAPSHOT_PATH = os.getenv("METRICS_SNAPSHOT_PATH", "metrics.prom")
+SNAPSHOT_SECONDS = int(os.getenv("METRICS_SNAPSHOT_SECONDS", "15"))
+
+# Latency buckets in seconds, wide enough for both HTTP fetches and model calls.
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+
+def _format_value(value) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+class _Metric:
+    """Base for a named metric family with a fixed set of label names."""
+
+    type = None
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = (), registry=None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        self._function = None
+        (registry or REGISTRY).register(self)
+
+    def _key(self, labels: dict) -> tuple:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def set_function(self, function):
+        """
+        Reads the value at scrape time instead of tracking it. `function` returns a
+        number for unlabelled metrics, or {label values tuple: number} otherwise.
+        """
+        self._function = function
+
+    def samples(self) -> list:
+        """Returns (suffix, labels, value) tuples for the exposition format."""
+        if self._function is not None:
+            values = self._function()
+            if not self.labelnames:
+                values = {(): values}
+        else:
+            with self._lock:
+                values = dict(self._values)
+        return [("", dict(zip(self.labelnames, key)), value) for key, value in sorted(values.items())]
+
+
+class Counter(_Metric):
+    """A value that only goes up, e.g. jobs analyzed or fetch errors."""
+
+    type = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    """A value that can go up and down, e.g. queue depth."""
+
+    type = "gauge"
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    """Counts observations into cumulative buckets, e.g. request latency."""
+
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = (), buckets: tuple = DEFAULT_BUCKETS, registry=None):
+        super().__init__(name, documentation, labelnames, registry)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            counts, total = self._values.get(key, ([0] * len(self.buckets), 0.0))
+            for n, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[n] += 1
+            self._values[key] = (counts, total + value)
+
+    @contextmanager
+    def time(self, **labels):
+        """Observes the wall time of the enclosed block, also when it raises."""
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.observe(time.monotonic() - started, **labels)
+
+    def samples(self) -> list:
+        with self._lock:
+            values = {key: (list(counts), total) for key, (counts, total) in self._values.items()}
+        samples = []
+        for key, (counts, total) in sorted(values.items()):
+            labels = dict(zip(self.labelnames, key))
+            for bound, count in zip(self.buckets, counts):
+                samples.append(("_bucket", {**labels, "le": _format_value(float(bound))}, count))
+            samples.append(("_sum", labels, total))
+            samples.append(("_count", labels, counts[-1]))
+        return samples
+
+
+class Registry:
+    """Holds metric families and renders them in the Prometheus text format."""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric {metric.name} is already registered.")
+            self._metrics[metric.name] = metric
+
+    def render(self) -> str:
+        lines = []
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for metric in metrics:
+            try:
+                samples = metric.samples()
+            except Exception:
+                # A failing scrape-time callback must not break the whole endpoint.
+                continue
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            for suffix, labels, value in samples:
+                lines.append(f"{metric.name}{suffix}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def render() -> str:
+    """Renders every registered metric."""
+    return REGISTRY.render()
+
+
+def write_snapshot(path: str):
+    """
+    Writes the rendered metrics to `path` atomically, so a process that does not
+    run the agent (e.g. a web worker) can serve the agent worker's metrics.
+    """
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    with open(tmp_path, "w") as f:
+        f.write(render())
+    os.replace(tmp_path, path)
+
+
+def read_snapshot(path: str):
+    """Returns the last snapshot written by write_snapshot, or None if there is none."""
+    try:
+        with open(path) as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+
+# --- Agent metrics ---
+RUNS = Counter("agent_runs_total", "Agent runs by outcome.", ("status",))
+RUN_DURATION = Histogram(
+    "agent_run_duration_seconds", "Wall time of a whole agent run.", ("status",),
+    buckets=(10, 30, 60, 120, 300, 600, 1200, 1800, 3600),
+)
+JOBS = Counter(
+    "agent_jobs_total",
+    "Jobs passing through each pipeline stage (found, enriched, prefiltered, reused, cached, analyzed, failed).",
+    ("stage",),
+)
+
+# --- Model metrics ---
+LLM_LATENCY = Histogram("llm_request_duration_seconds", "Latency of analysis model calls.", ("mode",))
+LLM_TOKENS = Counter("llm_tokens_total", "Tokens used by analysis model calls (cached is a subset of input).", ("type",))
+LLM_TOKENS_PER_JOB = Histogram(
+    "llm_tokens_per_job", "Tokens spent per analyzed job, by analysis mode.", ("mode", "type"),
+    buckets=(250, 500, 1000, 2000, 4000, 8000, 16000, 32000),
+)
+
+# --- Scheduler metrics (updated as tasks are queued and released) ---
+SCHEDULER_IN_FLIGHT = Gauge("scheduler_in_flight", "Tasks currently running under each adaptive scheduler.", ("scheduler",))
+SCHEDULER_WAITING = Gauge("scheduler_waiting", "Tasks queued for a slot in each adaptive scheduler.", ("scheduler",))
+SCHEDULER_WINDOW = Gauge("scheduler_window", "Current AIMD concurrency window of each adaptive scheduler.", ("scheduler",))
+
+# --- Enrichment fetch metrics ---
+FETCH_LATENCY = Histogram("fetch_duration_seconds", "Latency of enrichment HTTP fetches, including throttle wait.", ("host",))
+FETCHES = Counter("fetch_requests_total", "Enrichment HTTP fetches by outcome.", ("host", "status"))
+
+# --- Cache and logger metrics (read at scrape time) ---
+CACHE_HIT_RATIO = Gauge("cache_hit_ratio", "Hit ratio of each local cache since start.", ("cache",))
+CACHE_LOOKUPS = Counter("cache_lookups_total", "Local cache lookups by result.", ("cache", "result"))
+LOG_QUEUE_DEPTH = Gauge("log_queue_depth", "Log entries waiting for the background writer.")
+LOG_ENTRIES = Counter("log_entries_total", "Log entries handled by the background writer, by outcome.", ("outcome",))
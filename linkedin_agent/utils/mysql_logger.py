@@ -1,10 +1,18 @@
 import mysql.connector
 from mysql.connector import pooling
+import atexit
+import contextvars
 import os
-from datetime import datetime
+import queue
+import threading
+import time
+from datetime import datetime, date, timedelta
 from dotenv import load_dotenv
 import json
 
+from linkedin_agent.utils import metrics
+from linkedin_agent.utils.log_spool import LogSpool
+
 # Load environment variables from .env file
 load_dotenv()
 
@@ -14,14 +22,84 @@ DB_USER = os.getenv("DB_USER")
 DB_PASSWORD = os.getenv("DB_PASSWORD")
 DB_NAME = os.getenv("DB_NAME")
 
+# --- Log Writer Configuration ---
+# Log entries are queued and written in multi-row batches by a background thread.
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+LOG_BATCH_SIZE = int(os.getenv("LOG_BATCH_SIZE", "200"))
+LOG_FLUSH_INTERVAL = float(os.getenv("LOG_FLUSH_INTERVAL", "1.0"))
+# How long log() may block on a full queue before the entry is dropped (seconds).
+LOG_ENQUEUE_TIMEOUT = float(os.getenv("LOG_ENQUEUE_TIMEOUT", "0.05"))
+
+# --- Log Spool Configuration ---
+# Entries that cannot reach MySQL are appended here and replayed once it is back.
+LOG_SPOOL_PATH = os.getenv("LOG_SPOOL_PATH", "logs_spool.jsonl")
+LOG_SPOOL_COMPRESS = os.getenv("LOG_SPOOL_COMPRESS", "false").lower() == "true"
+LOG_REPLAY_INTERVAL = float(os.getenv("LOG_REPLAY_INTERVAL", "60"))
+LOG_REPLAY_BATCH_SIZE = int(os.getenv("LOG_REPLAY_BATCH_SIZE", "1000"))
+# Entries are dropped (and counted) once the spool file grows past this size.
+LOG_SPOOL_MAX_MB = float(os.getenv("LOG_SPOOL_MAX_MB", "100"))
+
+# --- Schema & Retention Configuration ---
+SCHEMA_PATH = os.getenv(
+    "LOG_SCHEMA_PATH",
+    os.path.join(os.path.dirname(__file__), "..", "..", "database", "schema.sql")
+)
+# Daily partitions older than this are dropped by apply_log_retention().
+LOG_RETENTION_DAYS = int(os.getenv("LOG_RETENTION_DAYS", "30"))
+# Number of future daily partitions kept ready ahead of time.
+LOG_PARTITION_AHEAD_DAYS = int(os.getenv("LOG_PARTITION_AHEAD_DAYS", "3"))
+
+INSERT_QUERY = """
+INSERT INTO logs (timestamp, run_id, level, source, message, details)
+VALUES (%s, %s, %s, %s, %s, %s)
+"""
+
+# The version database/schema.sql creates and records in `schema_version`.
+SCHEMA_VERSION = 2
+
+# Migrates the version 1 table created by earlier releases to version 2, as
+# (done check, statement) steps. A step whose check counts any rows was already
+# applied, so a migration interrupted between steps resumes where it stopped.
+LEGACY_MIGRATION = [
+    (
+        "SELECT COUNT(*) FROM information_schema.columns "
+        "WHERE table_schema = DATABASE() AND table_name = 'logs' AND column_name = 'run_id'",
+        "ALTER TABLE logs MODIFY id BIGINT NOT NULL AUTO_INCREMENT, "
+        "ADD COLUMN run_id CHAR(32) DEFAULT NULL AFTER timestamp, "
+        "DROP PRIMARY KEY, ADD PRIMARY KEY (id, timestamp), "
+        "ADD INDEX idx_timestamp_level (timestamp, level), "
+        "ADD INDEX idx_source_timestamp (source, timestamp), "
+        "ADD INDEX idx_run_id_timestamp (run_id, timestamp)",
+    ),
+    (
+        "SELECT COUNT(*) FROM information_schema.partitions "
+        "WHERE table_schema = DATABASE() AND table_name = 'logs' AND partition_name IS NOT NULL",
+        "ALTER TABLE logs PARTITION BY RANGE COLUMNS (timestamp) (PARTITION pmax VALUES LESS THAN (MAXVALUE))",
+    ),
+]
+
+# The run the current task or thread is logging for, attached to every entry.
+_run_id = contextvars.ContextVar("log_run_id", default=None)
+
 # Global connection pool object
 _connection_pool = None
+_init_lock = threading.Lock()
+# Set by the first init_db() call. Until then the writer never connects on its own,
+# so processes that only import the logger (scripts, benchmarks) stay offline.
+_db_requested = False
 
 def init_db():
     """
     Initializes the database connection pool and creates the 'logs' table.
     This is thread-safe and should be called once on application startup.
     """
+    global _db_requested
+    with _init_lock:
+        _db_requested = True
+        _init_pool()
+
+
+def _init_pool():
     global _connection_pool
     if _connection_pool:
         return # Avoid re-initializing
@@ -44,51 +122,301 @@ def init_db():
         print("--- (Logger) Initializing database schema... ---")
         with _connection_pool.get_connection() as conn:
             with conn.cursor() as cursor:
-                table_schema = """
-                CREATE TABLE IF NOT EXISTS logs (
-                    id INT AUTO_INCREMENT PRIMARY KEY,
-                    timestamp DATETIME NOT NULL,
-                    level VARCHAR(20) NOT NULL,
-                    source VARCHAR(255) NOT NULL,
-                    message TEXT NOT NULL,
-                    details JSON
-                )
-                """
-                cursor.execute(table_schema)
+                _migrate_schema(cursor)
+                for statement in _load_schema_statements():
+                    cursor.execute(statement)
                 conn.commit()
         print("--- (Logger) Schema initialized successfully. ---")
 
-    except mysql.connector.Error as e:
+    except (mysql.connector.Error, OSError) as e: # OSError: schema file missing or unreadable
         print(f"FATAL: Error during DB pool initialization: {e}")
         _connection_pool = None # Ensure pool is None if setup fails
 
-def log(level: str, source: str, message: str, details: dict = None):
+
+def _load_schema_statements() -> list:
+    """Splits database/schema.sql into statements, dropping comment lines."""
+    with open(SCHEMA_PATH, 'r') as f:
+        sql = "\n".join(line for line in f if not line.lstrip().startswith("--"))
+    return [statement.strip() for statement in sql.split(";") if statement.strip()]
+
+
+def _applied_schema_version(cursor) -> int:
     """
-    Inserts a new log entry into the database using a pooled connection.
-    This function is thread-safe.
+    Returns the schema version recorded in `schema_version`. Databases from before the
+    table existed report 1 if they have a `logs` table and 0 if they are empty.
     """
-    if not _connection_pool:
-        print("--- Fallback Print (Logger not initialized) ---")
-        print(f"{datetime.now()} [{level}] {source}: {message}")
-        return
+    cursor.execute(
+        "SELECT COUNT(*) FROM information_schema.tables "
+        "WHERE table_schema = DATABASE() AND table_name = 'schema_version'"
+    )
+    (has_versions,) = cursor.fetchone()
+    if has_versions:
+        cursor.execute("SELECT MAX(version) FROM schema_version")
+        (version,) = cursor.fetchone()
+        if version is not None:
+            return version
+    cursor.execute(
+        "SELECT COUNT(*) FROM information_schema.tables "
+        "WHERE table_schema = DATABASE() AND table_name = 'logs'"
+    )
+    (has_logs,) = cursor.fetchone()
+    return 1 if has_logs else 0
 
-    try:
+
+def _migrate_schema(cursor):
+    """
+    Upgrades a version 1 `logs` table (no run_id, no indexes, no partitions) in place.
+    The schema file then records SCHEMA_VERSION, so the upgrade runs only once.
+    """
+    version = _applied_schema_version(cursor)
+    if version > SCHEMA_VERSION:
+        raise mysql.connector.Error(
+            msg=f"Database schema version {version} is newer than this release ({SCHEMA_VERSION})."
+        )
+    if version == 1:
+        print(f"--- (Logger) Migrating legacy logs table to schema version {SCHEMA_VERSION}... ---")
+        for done_check, statement in LEGACY_MIGRATION:
+            cursor.execute(done_check)
+            (done,) = cursor.fetchone()
+            if not done:
+                cursor.execute(statement)
+
+
+def _fallback_print(rows, reason: str):
+    print(f"--- Fallback Print ({reason}) ---")
+    for timestamp, _, level, source, message, _ in rows:
+        print(f"{timestamp} [{level}] {source}: {message}")
+
+
+class _LogWriter:
+    """
+    Drains a bounded queue of log rows on a background thread and writes them with
+    multi-row executemany inserts, flushing when a batch fills or the interval expires.
+    """
+
+    def __init__(self, max_queue: int, batch_size: int, flush_interval: float, spool: LogSpool):
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.spool = spool
+        self._next_replay = 0.0
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._flush_requests = queue.Queue()
+        self._stop = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.stats = {"enqueued": 0, "written": 0, "dropped": 0, "batches": 0, "failed": 0, "spooled": 0, "replayed": 0}
+
+    def _count(self, stat: str, amount: int = 1):
+        with self._stats_lock:
+            self.stats[stat] += amount
+
+    def start(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, name="mysql-log-writer", daemon=True)
+                self._thread.start()
+
+    def put(self, row) -> bool:
+        """Queues a row, blocking briefly when the queue is full; returns False if it was dropped."""
+        self.start()
+        try:
+            self.queue.put(row, timeout=LOG_ENQUEUE_TIMEOUT)
+        except queue.Full:
+            self._count("dropped")
+            return False
+        self._count("enqueued")
+        return True
+
+    def _take_batch(self, timeout: float) -> list:
+        batch = []
+        try:
+            batch.append(self.queue.get(timeout=timeout))
+            while len(batch) < self.batch_size:
+                batch.append(self.queue.get_nowait())
+        except queue.Empty:
+            pass
+        return batch
+
+    def _insert(self, rows: list):
         # The 'with' statements ensure the connection is automatically returned to the pool
         with _connection_pool.get_connection() as conn:
             with conn.cursor() as cursor:
-                insert_query = """
-                INSERT INTO logs (timestamp, level, source, message, details)
-                VALUES (%s, %s, %s, %s, %s)
-                """
-                now = datetime.now()
-                details_json = json.dumps(details) if details else None
-                
-                cursor.execute(insert_query, (now, level, source, message, details_json))
+                cursor.executemany(INSERT_QUERY, rows)
                 conn.commit()
-    except mysql.connector.Error as e:
-        print(f"Error writing log to database: {e}")
-        print("--- Fallback Print (logging to DB failed) ---")
-        print(f"{datetime.now()} [{level}] {source}: {message}")
+
+    def _spool(self, batch: list, reason: str):
+        _fallback_print(batch, reason)
+        if self.spool.size() > LOG_SPOOL_MAX_MB * 1024 * 1024:
+            self._count("dropped", len(batch))
+            return
+        try:
+            self.spool.append(batch)
+            self._count("spooled", len(batch))
+        except OSError as e:
+            self._count("dropped", len(batch))
+            print(f"Error writing logs to spool file: {e}")
+
+    def _write(self, batch: list):
+        if not batch:
+            return
+        if not _connection_pool:
+            self._spool(batch, "Logger not initialized")
+            return
+        try:
+            self._insert(batch)
+            self._count("written", len(batch))
+            self._count("batches")
+        except Exception as e: # Never let a bad batch kill the writer thread
+            self._count("failed", len(batch))
+            print(f"Error writing logs to database: {e}")
+            self._spool(batch, "logging to DB failed")
+
+    def _replay(self):
+        """Reconnects if needed and replays spooled entries into `logs` in bulk batches."""
+        if not _db_requested or not self.spool.has_entries():
+            return
+        if not _connection_pool:
+            init_db()
+            if not _connection_pool:
+                return
+        rows = self.spool.take()
+        for start in range(0, len(rows), LOG_REPLAY_BATCH_SIZE):
+            try:
+                self._insert(rows[start:start + LOG_REPLAY_BATCH_SIZE])
+            except Exception as e:
+                print(f"Error replaying spooled logs: {e}")
+                self.spool.done(remaining=rows[start:])
+                return
+            self._count("replayed", len(rows[start:start + LOG_REPLAY_BATCH_SIZE]))
+        self.spool.done()
+        if rows:
+            print(f"--- (Logger) Replayed {len(rows)} spooled log entries ---")
+
+    def _drain(self):
+        while True:
+            batch = self._take_batch(timeout=0)
+            if not batch:
+                return
+            self._write(batch)
+
+    def _run(self):
+        deadline = time.monotonic() + self.flush_interval
+        pending = []
+        while not self._stop.is_set():
+            pending.extend(self._take_batch(timeout=max(0.0, deadline - time.monotonic())))
+            flush_requested = not self._flush_requests.empty()
+            if len(pending) >= self.batch_size or time.monotonic() >= deadline or flush_requested:
+                self._write(pending)
+                pending = []
+                if flush_requested:
+                    self._drain()
+                    while not self._flush_requests.empty():
+                        self._flush_requests.get_nowait().set()
+                deadline = time.monotonic() + self.flush_interval
+            if time.monotonic() >= self._next_replay:
+                self._replay()
+                self._next_replay = time.monotonic() + LOG_REPLAY_INTERVAL
+        self._write(pending)
+        self._drain()
+
+    def flush(self, timeout: float = 10):
+        """Blocks until everything queued so far has been written."""
+        if self._thread is None or not self._thread.is_alive():
+            self._drain()
+            return
+        done = threading.Event()
+        self._flush_requests.put(done)
+        done.wait(timeout)
+
+    def _spool_remaining(self, reason: str):
+        while True:
+            batch = self._take_batch(timeout=0)
+            if not batch:
+                return
+            self._spool(batch, reason)
+
+    def stop(self, timeout: float = 10):
+        """
+        Writes out the remaining queue and stops the writer thread. If the thread is still
+        busy after `timeout` (e.g. stuck on the database), the rest of the queue is spooled
+        for the next run instead of being written from the calling thread.
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            if self._thread.is_alive():
+                self._spool_remaining("writer did not stop in time")
+                return
+            self._thread = None
+        self._drain()
+
+
+_writer = _LogWriter(LOG_QUEUE_SIZE, LOG_BATCH_SIZE, LOG_FLUSH_INTERVAL, LogSpool(LOG_SPOOL_PATH, LOG_SPOOL_COMPRESS))
+atexit.register(_writer.stop)
+
+# Writer state is read at scrape time, so logging itself pays nothing for metrics.
+metrics.LOG_QUEUE_DEPTH.set_function(lambda: _writer.queue.qsize())
+metrics.LOG_ENTRIES.set_function(lambda: {
+    (outcome,): value for outcome, value in get_logger_stats().items()
+    if outcome in ("written", "dropped", "failed", "spooled", "replayed")
+})
+
+
+def set_run_id(run_id: str):
+    """Tags log entries from the current context with `run_id`; returns a token for reset_run_id."""
+    return _run_id.set(run_id)
+
+
+def reset_run_id(token):
+    _run_id.reset(token)
+
+
+def get_run_id():
+    return _run_id.get()
+
+
+def log(level: str, source: str, message: str, details: dict = None):
+    """
+    Queues a new log entry for the background writer. This never waits on the
+    database, so it is safe to call from async code. This function is thread-safe.
+    """
+    details_json = json.dumps(details, default=str) if details else None
+    _writer.put((datetime.now(), _run_id.get(), level, source, message, details_json))
+
+
+def get_run_logs(run_id: str) -> list:
+    """Returns every log entry of a run, oldest first, using the (run_id, timestamp) index."""
+    if not _connection_pool:
+        return []
+    flush_logs()
+    with _connection_pool.get_connection() as conn:
+        with conn.cursor(dictionary=True) as cursor:
+            cursor.execute(
+                "SELECT timestamp, level, source, message, details FROM logs "
+                "WHERE run_id = %s ORDER BY timestamp, id",
+                (run_id,)
+            )
+            return cursor.fetchall()
+
+
+def flush_logs(timeout: float = 10):
+    """Blocks until every queued log entry has been written."""
+    _writer.flush(timeout)
+
+
+def shutdown_logger(timeout: float = 10):
+    """Flushes the queue and stops the background writer."""
+    _writer.stop(timeout)
+
+
+def get_logger_stats() -> dict:
+    """Returns writer counters plus the current queue depth."""
+    with _writer._stats_lock:
+        stats = dict(_writer.stats)
+    stats["queue_depth"] = _writer.queue.qsize()
+    return stats
 
 def clear_logs():
     """
@@ -101,6 +429,7 @@ def clear_logs():
 
     try:
         log('INFO', 'LogManager', 'Attempting to clear the logs table.')
+        flush_logs()
         with _connection_pool.get_connection() as conn:
             with conn.cursor() as cursor:
                 cursor.execute("TRUNCATE TABLE logs")
@@ -109,4 +438,56 @@ def clear_logs():
         print("--- Logs table cleared successfully ---")
     except mysql.connector.Error as e:
         log('ERROR', 'LogManager', 'Failed to clear the logs table.', {'error': str(e)})
-        print(f"Error clearing logs table: {e}")
\ No newline at end of file
+        print(f"Error clearing logs table: {e}")
+
+
+def _partition_name(day: date) -> str:
+    return f"p{day:%Y%m%d}"
+
+
+def apply_log_retention():
+    """
+    Rolling retention for the partitioned logs table: splits `pmax` so a daily partition
+    exists for today and the next LOG_PARTITION_AHEAD_DAYS days, then drops the daily
+    partitions older than LOG_RETENTION_DAYS. Dropping a partition is a cheap metadata
+    operation, unlike deleting or truncating rows.
+    """
+    if not _connection_pool:
+        print("--- Fallback Print (Logger not initialized) ---")
+        print("Could not apply log retention because logger is not initialized.")
+        return
+
+    try:
+        with _connection_pool.get_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(
+                    "SELECT partition_name FROM information_schema.partitions "
+                    "WHERE table_schema = DATABASE() AND table_name = 'logs' AND partition_name IS NOT NULL"
+                )
+                existing = {row[0] for row in cursor.fetchall()}
+                if "pmax" not in existing:
+                    log('WARNING', 'LogManager', 'Logs table is not partitioned; skipping retention.')
+                    return
+
+                today = date.today()
+                daily = sorted(name for name in existing if name != "pmax")
+                newest = datetime.strptime(daily[-1], "p%Y%m%d").date() if daily else today - timedelta(days=1)
+                new_days = [newest + timedelta(days=n) for n in range(1, (today - newest).days + LOG_PARTITION_AHEAD_DAYS + 1)]
+                if new_days:
+                    partitions = ", ".join(
+                        f"PARTITION {_partition_name(day)} VALUES LESS THAN ('{day + timedelta(days=1):%Y-%m-%d}')"
+                        for day in new_days
+                    )
+                    cursor.execute(
+                        f"ALTER TABLE logs REORGANIZE PARTITION pmax INTO ({partitions}, PARTITION pmax VALUES LESS THAN (MAXVALUE))"
+                    )
+
+                cutoff = _partition_name(today - timedelta(days=LOG_RETENTION_DAYS))
+                expired = [name for name in daily if name < cutoff]
+                if expired:
+                    cursor.execute(f"ALTER TABLE logs DROP PARTITION {', '.join(expired)}")
+                conn.commit()
+        log('INFO', 'LogManager', 'Applied log retention.', {'added_partitions': len(new_days), 'dropped_partitions': expired})
+    except mysql.connector.Error as e:
+        log('ERROR', 'LogManager', 'Failed to apply log retention.', {'error': str(e)})
+        print(f"Error applying log retention: {e}")
@@ -0,0 +1,141 @@
+import json
+import math
+import os
+import re
+from collections import Counter
+from functools import lru_cache
+
+# --- Pre-filter Configuration ---
+# Jobs scoring below PREFILTER_MIN_SCORE (0-1 cosine similarity) are dropped.
+PREFILTER_MIN_SCORE = float(os.getenv("PREFILTER_MIN_SCORE", "0"))
+# Keep at most this many of the best scoring jobs (0 keeps all).
+PREFILTER_TOP_N = int(os.getenv("PREFILTER_TOP_N", "0"))
+# Comma separated title terms that reject a job (e.g. "intern,junior,principal").
+PREFILTER_EXCLUDE_TITLE_TERMS = [t.strip().lower() for t in os.getenv("PREFILTER_EXCLUDE_TITLE_TERMS", "").split(",") if t.strip()]
+# Comma separated location terms; when set, a job's location must contain one of them.
+PREFILTER_LOCATION_ALLOW = [t.strip().lower() for t in os.getenv("PREFILTER_LOCATION_ALLOW", "").split(",") if t.strip()]
+
+PROFICIENCY_WEIGHTS = {"expert": 3.0, "proficient": 2.0, "intermediate": 1.0}
+
+_STOPWORDS = {"and", "or", "of", "the", "for", "to", "in", "a", "an", "with", "on"}
+
+_TOKEN = re.compile(r"[a-z0-9#+][a-z0-9#+./-]*")
+
+
+def tokenize(text: str) -> list:
+    """Lowercases and splits text into terms, keeping tech names like c#, .net, node.js and ci/cd."""
+    text = (text or "").lower().replace(".net", " dotnet ")
+    return [token.rstrip(".-/") for token in _TOKEN.findall(text)]
+
+
+@lru_cache(maxsize=4)
+def _vocabulary(profile_json: str):
+    """
+    Returns ({term: weight}, {term: idf}) for the profile. IDF treats every skill entry
+    as a document, so terms shared by many skills (e.g. "azure") count for less; it
+    depends only on the profile, so a job scores the same whatever else is in the batch.
+    """
+    profile = json.loads(profile_json)
+    vocabulary = {}
+    document_frequency = Counter()
+    documents = 0
+
+    def add(skill: str, weight: float):
+        nonlocal documents
+        terms = {term for term in tokenize(skill) if term not in _STOPWORDS and (len(term) > 1 or term in ("c", "r"))}
+        documents += 1
+        document_frequency.update(terms)
+        for term in terms:
+            vocabulary[term] = max(vocabulary.get(term, 0.0), weight)
+
+    # Categories map proficiency levels to skill lists; flat lists
+    # (certifications, academics) are prose and left out of the vocabulary.
+    for category in profile.values():
+        if not isinstance(category, dict):
+            continue
+        for level, skills in category.items():
+            weight = PROFICIENCY_WEIGHTS.get(level.lower(), 1.0)
+            for skill in skills or []:
+                add(skill, weight)
+    idf = {term: math.log((1 + documents) / (1 + document_frequency[term])) + 1 for term in vocabulary}
+    return vocabulary, idf
+
+
+def build_skill_vocabulary(profile: dict) -> dict:
+    """Returns {term: weight} for every skill term in the profile, weighted by proficiency."""
+    return _vocabulary(json.dumps(profile, sort_keys=True))[0]
+
+
+def _job_text(job: dict) -> str:
+    return " ".join(str(job.get(field) or "") for field in ("job_title", "job_description", "location"))
+
+
+def score_jobs(profile: dict, jobs: list) -> list:
+    """
+    Scores each job by the TF-IDF weighted cosine similarity between its text and the
+    profile's skill vocabulary, with IDF taken from the profile's skills.
+    """
+    vocabulary, idf = _vocabulary(json.dumps(profile, sort_keys=True))
+    term_counts = [Counter(t for t in tokenize(_job_text(job)) if t in vocabulary) for job in jobs]
+    profile_norm = math.sqrt(sum(w * w for w in vocabulary.values())) or 1.0
+
+    scores = []
+    for counts in term_counts:
+        vector = {
+            term: (1 + math.log(count)) * idf[term]
+            for term, count in counts.items()
+        }
+        job_norm = math.sqrt(sum(v * v for v in vector.values()))
+        dot = sum(v * vocabulary[term] for term, v in vector.items())
+        scores.append(round(dot / (job_norm * profile_norm), 4) if job_norm else 0.0)
+    return scores
+
+
+def _rule_rejection(job: dict):
+    title = str(job.get("job_title") or "").lower()
+    for term in PREFILTER_EXCLUDE_TITLE_TERMS:
+        if term in title:
+            return f"title contains '{term}'"
+    if PREFILTER_LOCATION_ALLOW:
+        location = str(job.get("location") or "").lower()
+        if not any(term in location for term in PREFILTER_LOCATION_ALLOW):
+            return "location not allowed"
+    return None
+
+
+def screen_jobs(jobs: list):
+    """
+    Applies the title and location rules, which only need the search result, so jobs
+    can be dropped before they are scraped. Returns (kept_positions, rejected) like
+    prefilter_jobs.
+    """
+    kept, rejected = [], []
+    for position, job in enumerate(jobs):
+        reason = _rule_rejection(job)
+        if reason:
+            rejected.append((position, reason))
+        else:
+            kept.append(position)
+    return kept, rejected
+
+
+def prefilter_jobs(profile: dict, jobs: list):
+    """
+    Applies the score threshold, then keeps the PREFILTER_TOP_N best jobs. Run it after
+    enrichment, so the job description is part of the score.
+    Returns (kept_positions, rejected) where rejected is a list of (position, reason).
+    Positions index into `jobs` and kept positions keep their original order.
+    """
+    scores = score_jobs(profile, jobs)
+    kept, rejected = [], []
+    for position, score in enumerate(scores):
+        if score < PREFILTER_MIN_SCORE:
+            rejected.append((position, f"score {score} below {PREFILTER_MIN_SCORE}"))
+        else:
+            kept.append(position)
+
+    if PREFILTER_TOP_N and len(kept) > PREFILTER_TOP_N:
+        ranked = sorted(kept, key=lambda p: scores[p], reverse=True)
+        rejected.extend((p, "outside top-N") for p in ranked[PREFILTER_TOP_N:])
+        kept = sorted(ranked[:PREFILTER_TOP_N])
+    return kept, rejected
@@ -0,0 +1,144 @@
+import json
+import os
+import threading
+from functools import lru_cache
+
+import tiktoken
+
+from linkedin_agent.utils.mysql_logger import log
+
+# --- Prompt Input Configuration ---
+# Token budgets for the free-text job fields; longer descriptions are cut at the budget.
+JOB_DESCRIPTION_TOKEN_BUDGET = int(os.getenv("JOB_DESCRIPTION_TOKEN_BUDGET", "1500"))
+COMPANY_DESCRIPTION_TOKEN_BUDGET = int(os.getenv("COMPANY_DESCRIPTION_TOKEN_BUDGET", "300"))
+PROMPT_TOKEN_ENCODING = os.getenv("PROMPT_TOKEN_ENCODING", "o200k_base")
+
+# Job fields the analysis reads, with the token budget of the ones that get trimmed.
+JOB_PROMPT_FIELDS = {
+    "job_title": None,
+    "company": None,
+    "location": None,
+    "linkedin_url": None,
+    "benefits": None,
+    "job_description": JOB_DESCRIPTION_TOKEN_BUDGET,
+    "company_description": COMPANY_DESCRIPTION_TOKEN_BUDGET,
+}
+
+# Rough characters per token, used when the tokenizer cannot be loaded.
+_CHARS_PER_TOKEN = 4
+
+
+@lru_cache(maxsize=1)
+def _encoding():
+    # The encoding file is downloaded on first use; without it, budgets fall back to characters.
+    try:
+        return tiktoken.get_encoding(PROMPT_TOKEN_ENCODING)
+    except Exception as e:
+        log('WARNING', 'PromptInputs', 'Tokenizer unavailable, estimating tokens from characters.', {'error': str(e)})
+        return None
+
+
+def count_tokens(text: str) -> int:
+    encoding = _encoding()
+    if encoding is None:
+        return len(text) // _CHARS_PER_TOKEN
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def trim_to_tokens(text: str, budget: int) -> str:
+    """Cuts text to at most `budget` tokens, marking the cut with an ellipsis."""
+    encoding = _encoding()
+    if encoding is None:
+        limit = budget * _CHARS_PER_TOKEN
+        return text if len(text) <= limit else text[:limit].rstrip() + "…"
+    tokens = encoding.encode(text, disallowed_special=())
+    if len(tokens) <= budget:
+        return text
+    return encoding.decode(tokens[:budget]).rstrip() + "…"
+
+
+def encode_json(value) -> str:
+    """Minified JSON, as sent to the model."""
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+
+def compact_job(job: dict) -> dict:
+    """Keeps only the job fields the analysis needs, with long descriptions trimmed to budget."""
+    if not isinstance(job, dict):
+        return {}
+    compact = {}
+    for field, budget in JOB_PROMPT_FIELDS.items():
+        value = job.get(field)
+        if value in (None, "", "..."):
+            continue
+        if budget and isinstance(value, str):
+            value = trim_to_tokens(" ".join(value.split()), budget)
+        compact[field] = value
+    return compact
+
+
+def skill_table(profile: dict) -> str:
+    """
+    Flattens the profile into one line per category, e.g.
+    "Databases | Expert: CosmosDB, MySQL | Proficient: Redis". Empty levels are left out.
+    """
+    lines = []
+    for category, skills in profile.items():
+        if isinstance(skills, dict):
+            levels = [f"{level}: {', '.join(items)}" for level, items in skills.items() if items]
+            if levels:
+                lines.append(" | ".join([category, *levels]))
+        elif isinstance(skills, list) and skills:
+            lines.append(f"{category}: " + "; ".join(str(item) for item in skills))
+        elif skills:
+            lines.append(f"{category}: {skills}")
+    return "\n".join(lines)
+
+
+class Profile:
+    """The candidate profile as loaded from disk, with its compact prompt encoding."""
+
+    def __init__(self, data: dict):
+        self.data = data
+        self.table = skill_table(data)
+
+
+_profile_lock = threading.Lock()
+_profiles = {}
+
+
+def load_profile(path: str) -> Profile:
+    """
+    Returns the profile at `path`, read and flattened once and reloaded only when the
+    file's mtime changes. Raises FileNotFoundError or json.JSONDecodeError like json.load.
+    """
+    stamp = os.stat(path).st_mtime_ns
+    with _profile_lock:
+        cached = _profiles.get(path)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+
+    with open(path, 'r') as f:
+        profile = Profile(json.load(f))
+    with _profile_lock:
+        _profiles[path] = (stamp, profile)
+    return profile
+
+
+def encoding_savings(profile: Profile, jobs: list, compact_jobs: list, calls: int) -> dict:
+    """
+    Compares the prompt tokens of the compact encoding with the previous one (indented
+    profile and full indented jobs) for `calls` requests over `jobs`.
+    """
+    profile_before = count_tokens(json.dumps(profile.data, indent=2))
+    profile_after = count_tokens(profile.table)
+    jobs_before = sum(count_tokens(json.dumps(job, indent=2)) for job in jobs)
+    jobs_after = sum(count_tokens(encode_json(job)) for job in compact_jobs)
+    before = profile_before * calls + jobs_before
+    after = profile_after * calls + jobs_after
+    return {
+        "tokens_before": before,
+        "tokens_after": after,
+        "tokens_saved": before - after,
+        "saved_ratio": round(1 - after / before, 3) if before else 0.0,
+    }
@@ -1,4 +1,7 @@
-import json
+import html
+from string import Formatter
+
+from linkedin_agent.utils.analysis_schema import NOT_SPECIFIED, JobAnalysis, parse_analysis
 
 # STEP 2: The HTML structure is now a separate template string.
 # It uses standard Python .format() placeholders.
@@ -47,67 +50,92 @@ JOB_CARD_TEMPLATE = '''
 </div>
 '''
 
+# The template is split into (literal, field) pairs once, so rendering is a single join.
+_CARD_PARTS = [(literal, field) for literal, field, _, _ in Formatter().parse(JOB_CARD_TEMPLATE)]
+
+# Fit bands by minimum score, best first.
+FIT_BANDS = (
+    (90, {"emoji": "🌟", "word": "Excellent", "bg_color": "#e8eaf6", "text_color": "#3f51b5"}),
+    (75, {"emoji": "✅", "word": "Strong", "bg_color": "#e8f5e9", "text_color": "#2e7d32"}),
+    (60, {"emoji": "👍", "word": "Good", "bg_color": "#fff3e0", "text_color": "#f57c00"}),
+    (40, {"emoji": "⚠️", "word": "Weak", "bg_color": "#ffecb3", "text_color": "#ff6f00"}),
+    (0, {"emoji": "❌", "word": "Poor", "bg_color": "#ffebee", "text_color": "#c62828"}),
+)
+
+
+def _escape(value, default: str = "") -> str:
+    """HTML-escapes a model-provided value; null falls back to `default`."""
+    return html.escape(value) if value else default
+
+
+def _fit_details(fit_score: int) -> dict:
+    return next(details for minimum, details in FIT_BANDS if fit_score >= minimum)
+
+
+def _safe_url(url) -> str:
+    """Only http(s) links make it into the card."""
+    return html.escape(url) if url and url.startswith(("https://", "http://")) else "#"
+
+
+def render_error_card(raw_output: str) -> str:
+    """Renders the card shown when the model output cannot be parsed."""
+    return f"<div style='color: red;'>Error: Invalid JSON received from model.</div><pre>{_escape(str(raw_output))}</pre>"
+
+
 # STEP 3: A helper function to perform the rendering logic that was offloaded from the LLM.
-def render_job_card(analysis_json: str) -> str:
+def render_job_card(analysis) -> str:
     """
     Renders the final HTML card by taking the JSON output from the LLM,
     handling deterministic logic, and formatting it into the HTML template.
 
     Args:
-        analysis_json: A string containing the JSON data from the LLM.
+        analysis: The raw model output (fenced or with surrounding text is fine),
+            or an already parsed JobAnalysis.
 
     Returns:
         A string containing the final, rendered HTML card.
     """
-    try:
-        data = json.loads(analysis_json)
-    except json.JSONDecodeError:
-        return f"<div style='color: red;'>Error: Invalid JSON received from model.</div><pre>{analysis_json}</pre>"
-
-    # --- Handle deterministic logic ---
-    fit_score = data.get("fitScore", 0)
-    fit_details = {}
-    if fit_score >= 90:
-        fit_details = {"emoji": "🌟", "word": "Excellent", "bg_color": "#e8eaf6", "text_color": "#3f51b5"}
-    elif 75 <= fit_score < 90:
-        fit_details = {"emoji": "✅", "word": "Strong", "bg_color": "#e8f5e9", "text_color": "#2e7d32"}
-    elif 60 <= fit_score < 75:
-        fit_details = {"emoji": "👍", "word": "Good", "bg_color": "#fff3e0", "text_color": "#f57c00"}
-    elif 40 <= fit_score < 60:
-        fit_details = {"emoji": "⚠️", "word": "Weak", "bg_color": "#ffecb3", "text_color": "#ff6f00"}
-    else:
-        fit_details = {"emoji": "❌", "word": "Poor", "bg_color": "#ffebee", "text_color": "#c62828"}
+    data = parse_analysis(analysis)
+    if data is None:
+        return render_error_card(analysis)
+    return render_analysis(data)
+
+
+def render_analysis(data: JobAnalysis) -> str:
+    """Renders a validated analysis. Every model-provided value is HTML escaped."""
+    fit_details = _fit_details(data.fitScore)
 
     # --- Build HTML lists ---
-    matching_skills_html = ""
-    for item in data.get("matchingSkills", []):
-        matching_skills_html += f"<li><strong>{item.get('skill', '')}:</strong> ({item.get('proficiency', '')}) {item.get('reason', '')}</li>"
-    if not matching_skills_html:
-        matching_skills_html = "<li>None specified.</li>"
-
-    missing_skills_html = ""
-    for item in data.get("missingSkills", []):
-        missing_skills_html += f"<li><strong>{item.get('skill', '')}:</strong> {item.get('reason', '')}</li>"
-    if not missing_skills_html:
-        missing_skills_html = "<li>None specified.</li>"
-
-    # --- Format the final template ---
-    return JOB_CARD_TEMPLATE.format(
-        companyName=data.get("companyName", "Not specified"),
-        jobTitle=data.get("jobTitle", "Not specified"),
-        location=data.get("location", "Not specified"),
-        workType=data.get("workType", "Not specified"),
-        workTypeEmoji=data.get("workTypeEmoji", "❓"),
-        salary=data.get("salary", "Not specified"),
-        fit_bg_color=fit_details.get("bg_color"),
-        fit_text_color=fit_details.get("text_color"),
-        fit_emoji=fit_details.get("emoji"),
-        fit_word=fit_details.get("word"),
-        fit_score=fit_score,
-        fitReasoning=data.get("fitReasoning", ""),
-        matching_skills_list=matching_skills_html,
-        missing_skills_list=missing_skills_html,
-        notes=data.get("notes", ""),
-        companyDescription=data.get("companyDescription", ""),
-        linkedinUrl=data.get("linkedinUrl", "#")
+    matching_skills_html = "".join(
+        f"<li><strong>{_escape(item.skill)}:</strong> ({_escape(item.proficiency)}) {_escape(item.reason)}</li>"
+        for item in data.matchingSkills
+    ) or "<li>None specified.</li>"
+    missing_skills_html = "".join(
+        f"<li><strong>{_escape(item.skill)}:</strong> {_escape(item.reason)}</li>"
+        for item in data.missingSkills
+    ) or "<li>None specified.</li>"
+
+    # --- Fill the precompiled template ---
+    values = {
+        "companyName": _escape(data.companyName),
+        "jobTitle": _escape(data.jobTitle),
+        "location": _escape(data.location, NOT_SPECIFIED),
+        "workType": _escape(data.workType, NOT_SPECIFIED),
+        "workTypeEmoji": _escape(data.workTypeEmoji, "❓"),
+        "salary": _escape(data.salary, NOT_SPECIFIED),
+        "fit_bg_color": fit_details["bg_color"],
+        "fit_text_color": fit_details["text_color"],
+        "fit_emoji": fit_details["emoji"],
+        "fit_word": fit_details["word"],
+        "fit_score": data.fitScore,
+        "fitReasoning": _escape(data.fitReasoning),
+        "matching_skills_list": matching_skills_html,
+        "missing_skills_list": missing_skills_html,
+        "notes": _escape(data.notes),
+        "companyDescription": _escape(data.companyDescription),
+        "linkedinUrl": _safe_url(data.linkedinUrl),
+    }
+    return "".join(
+        literal if field is None else f"{literal}{values[field]}"
+        for literal, field in _CARD_PARTS
     )
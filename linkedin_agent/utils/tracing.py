@@ -0,0 +1,256 @@
+import contextvars
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+from langchain_core.runnables import RunnableConfig
+
+from linkedin_agent.utils.mysql_logger import log, reset_run_id, set_run_id
+
+# --- Tracing Configuration ---
+# Directory for per-run OTLP/JSON trace files; empty disables the export.
+TRACE_EXPORT_DIR = os.getenv("TRACE_EXPORT_DIR", "traces")
+# Individual spans are logged at this level; the per-run summary is always logged at INFO.
+TRACE_LOG_LEVEL = os.getenv("TRACE_LOG_LEVEL", "DEBUG")
+SERVICE_NAME = "linkedin-agent"
+
+# Numeric span attributes that are summed in the run summary.
+SUMMED_ATTRIBUTES = ("retries", "bytes", "input_tokens", "output_tokens", "cached_tokens", "wait_ms")
+
+
+class Span:
+    """One timed operation inside a run."""
+
+    def __init__(self, name: str, trace_id: str, parent_id: str = None, attributes: dict = None):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent_id
+        self.attributes = dict(attributes or {})
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.error = None
+
+    @property
+    def duration_ms(self) -> float:
+        end = self.end_ns or time.time_ns()
+        return (end - self.start_ns) / 1e6
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def add(self, key: str, amount=1):
+        self.attributes[key] = self.attributes.get(key, 0) + amount
+
+
+class _NoopSpan(Span):
+    """Returned when no run is being traced, so callers never need to check."""
+
+    def __init__(self):
+        super().__init__("noop", "")
+
+    def set(self, **attributes):
+        pass
+
+    def add(self, key: str, amount=1):
+        pass
+
+
+class RunTrace:
+    """All spans recorded for one agent run."""
+
+    def __init__(self, name: str, run_id: str = None):
+        self.name = name
+        self.run_id = run_id or uuid.uuid4().hex
+        self.spans = []
+        self._lock = threading.Lock()
+
+    def record(self, span: Span):
+        with self._lock:
+            self.spans.append(span)
+
+
+_current_run = contextvars.ContextVar("trace_run", default=None)
+_current_span = contextvars.ContextVar("trace_span", default=None)
+
+
+def current_run():
+    return _current_run.get()
+
+
+def current_span() -> Span:
+    """Returns the innermost active span, or a no-op span outside a traced run."""
+    return _current_span.get() or _NoopSpan()
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """Times the enclosed block as a child of the current span. Works in sync and async code."""
+    run = _current_run.get()
+    if run is None:
+        yield _NoopSpan()
+        return
+
+    parent = _current_span.get()
+    current = Span(name, run.run_id, parent.span_id if parent else None, attributes)
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        current.end_ns = time.time_ns()
+        _current_span.reset(token)
+        run.record(current)
+        log(TRACE_LOG_LEVEL, 'Trace', f'span {name}', {
+            'span_id': current.span_id,
+            'parent_id': current.parent_id,
+            'duration_ms': round(current.duration_ms, 1),
+            'error': current.error,
+            **current.attributes,
+        })
+
+
+@contextmanager
+def run_trace(name: str):
+    """
+    Starts a traced run with a fresh run ID (also attached to every log entry).
+    When a run is already active this is just a span inside it. On exit the run
+    summary is printed and logged, and the trace is exported as OTLP/JSON.
+    """
+    if _current_run.get() is not None:
+        with span(name):
+            yield _current_run.get()
+        return
+
+    run = RunTrace(name)
+    run_token = _current_run.set(run)
+    log_token = set_run_id(run.run_id)
+    try:
+        with span(name):
+            yield run
+    finally:
+        _current_run.reset(run_token)
+        rows = summarize(run)
+        print(f"--- Trace summary for run {run.run_id} ---")
+        print(format_summary(rows))
+        log('INFO', 'Trace', 'Run summary.', {'run_id': run.run_id, 'spans': rows})
+        if TRACE_EXPORT_DIR:
+            try:
+                path = export_otlp_json(run, os.path.join(TRACE_EXPORT_DIR, f"{run.run_id}.json"))
+                log('INFO', 'Trace', f'Exported trace to {path}.')
+            except OSError as e:
+                log('WARNING', 'Trace', 'Failed to export trace.', {'error': str(e)})
+        reset_run_id(log_token)
+
+
+def record_llm_usage(target: Span, message):
+    """Adds the token counts from an AIMessage's usage_metadata to `target`."""
+    usage = getattr(message, "usage_metadata", None) or {}
+    target.add("input_tokens", usage.get("input_tokens", 0))
+    target.add("output_tokens", usage.get("output_tokens", 0))
+    cached = (usage.get("input_token_details") or {}).get("cache_read")
+    if cached:
+        target.add("cached_tokens", cached)
+
+
+def traced_node(name: str, node):
+    """Wraps a LangGraph node (function or Runnable such as ToolNode) in a span."""
+    if hasattr(node, "ainvoke"):
+        async def runnable_wrapper(state, config: RunnableConfig):
+            with span(f"node:{name}"):
+                return await node.ainvoke(state, config)
+        return runnable_wrapper
+
+    if inspect.iscoroutinefunction(node):
+        @functools.wraps(node)
+        async def async_wrapper(state):
+            with span(f"node:{name}"):
+                return await node(state)
+        return async_wrapper
+
+    @functools.wraps(node)
+    def sync_wrapper(state):
+        with span(f"node:{name}"):
+            return node(state)
+    return sync_wrapper
+
+
+def summarize(run: RunTrace) -> list:
+    """Aggregates spans by name: count, errors, total/avg/max wall time and summed counters."""
+    groups = {}
+    with run._lock:
+        spans = list(run.spans)
+    for s in spans:
+        row = groups.setdefault(s.name, {"name": s.name, "count": 0, "errors": 0, "total_ms": 0.0, "max_ms": 0.0})
+        row["count"] += 1
+        row["errors"] += 1 if s.error else 0
+        row["total_ms"] += s.duration_ms
+        row["max_ms"] = max(row["max_ms"], s.duration_ms)
+        for key in SUMMED_ATTRIBUTES:
+            if isinstance(s.attributes.get(key), (int, float)):
+                row[key] = row.get(key, 0) + s.attributes[key]
+    rows = sorted(groups.values(), key=lambda r: r["total_ms"], reverse=True)
+    for row in rows:
+        row["avg_ms"] = round(row["total_ms"] / row["count"], 1)
+        row["total_ms"] = round(row["total_ms"], 1)
+        row["max_ms"] = round(row["max_ms"], 1)
+    return rows
+
+
+def format_summary(rows: list) -> str:
+    """Renders summary rows as a fixed-width table."""
+    lines = [f"{'span':<32}{'count':>7}{'errors':>8}{'total ms':>12}{'avg ms':>10}{'max ms':>10}  counters"]
+    for row in rows:
+        counters = ", ".join(f"{key}={round(row[key])}" for key in SUMMED_ATTRIBUTES if key in row)
+        lines.append(
+            f"{row['name'][:31]:<32}{row['count']:>7}{row['errors']:>8}{row['total_ms']:>12}"
+            f"{row['avg_ms']:>10}{row['max_ms']:>10}  {counters}"
+        )
+    return "\n".join(lines)
+
+
+def _otlp_value(value) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def export_otlp_json(run: RunTrace, path: str) -> str:
+    """Writes the run as an OTLP/JSON trace file that OpenTelemetry tooling can import."""
+    spans = []
+    with run._lock:
+        recorded = list(run.spans)
+    for s in recorded:
+        otlp_span = {
+            "traceId": s.trace_id,
+            "spanId": s.span_id,
+            "name": s.name,
+            "kind": 1,
+            "startTimeUnixNano": str(s.start_ns),
+            "endTimeUnixNano": str(s.end_ns or s.start_ns),
+            "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in s.attributes.items()],
+            "status": {"code": 2, "message": s.error} if s.error else {"code": 1},
+        }
+        if s.parent_id:
+            otlp_span["parentSpanId"] = s.parent_id
+        spans.append(otlp_span)
+
+    document = {"resourceSpans": [{
+        "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": SERVICE_NAME}}]},
+        "scopeSpans": [{"scope": {"name": "linkedin_agent"}, "spans": spans}],
+    }]}
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(document, f)
+    return path
@@ -0,0 +1,144 @@
+"""
+Compares the per-job analysis path against batch mode (K jobs per request) and
+structured-output mode (schema bound to the model instead of written in the prompt).
+
+    python prototype/bench-batch-analysis.py --batch-size 5 --dry-run   # prompt tokens only, no API calls
+    python prototype/bench-batch-analysis.py --batch-size 5             # live run against MODEL_NAME
+
+Prices are USD per 1M tokens and default to gpt-4o-mini list prices. In the dry run the
+structured rows include the JSON schema sent as response_format, which is billed as input,
+and cached tokens are estimated as the shared system prefix of every request after the
+first (OpenAI only caches prefixes of at least 1024 tokens).
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+import tiktoken
+from dotenv import load_dotenv
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from linkedin_agent.prompts import prompts
+from linkedin_agent.utils.analysis_schema import JobAnalysis
+from linkedin_agent.utils.prompt_inputs import Profile, compact_job, encode_json
+
+load_dotenv()
+
+MODEL_NAME = os.getenv("MODEL_NAME", "gpt-4o-mini")
+SAMPLE_JOBS = "linkedin_agent/model/search_jobs-linkedin-mcp-response-sample.json"
+PROFILE = os.getenv("PROFILE_JSON_PATH", "linkedin_agent/model/profile.json")
+
+
+def load_inputs(jobs_path: str):
+    with open(PROFILE) as f:
+        profile = Profile(json.load(f))
+    with open(jobs_path) as f:
+        # The sample file contains unescaped backslashes in job titles.
+        jobs = json.loads(f.read().replace("\\", "\\\\"))
+    # Prompts are built from the same compact encoding the agent sends.
+    return profile.table, [compact_job(job) for job in jobs]
+
+
+def per_job_prompts(profile, jobs, today):
+    return [
+        prompts.job_analysis_prompt.format_messages(profile=profile, job=encode_json(job), date=today)
+        for job in jobs
+    ]
+
+
+def structured_prompts(profile, jobs, today):
+    return [
+        prompts.structured_job_analysis_prompt.format_messages(profile=profile, job=encode_json(job), date=today)
+        for job in jobs
+    ]
+
+
+def batch_prompts(profile, jobs, today, k):
+    batches = [jobs[n:n + k] for n in range(0, len(jobs), k)]
+    return [
+        prompts.batch_job_analysis_prompt.format_messages(
+            profile=profile,
+            jobs=encode_json([dict(job, jobIndex=i) for i, job in enumerate(batch)]),
+            count=len(batch),
+            date=today,
+        )
+        for batch in batches
+    ]
+
+
+async def run_live(model, prompt_list):
+    started = time.monotonic()
+    # Like the agent, the first request runs alone to warm the provider's prompt cache
+    results = [await model.ainvoke(prompt_list[0])]
+    results += await asyncio.gather(*(model.ainvoke(p) for p in prompt_list[1:]))
+    elapsed = time.monotonic() - started
+    # Structured models (include_raw=True) return {"raw", "parsed", "parsing_error"}
+    usage = [(r["raw"] if isinstance(r, dict) else r).usage_metadata or {} for r in results]
+    return {
+        "requests": len(prompt_list),
+        "input_tokens": sum(u.get("input_tokens", 0) for u in usage),
+        "cached_tokens": sum((u.get("input_token_details") or {}).get("cache_read") or 0 for u in usage),
+        "output_tokens": sum(u.get("output_tokens", 0) for u in usage),
+        "seconds": round(elapsed, 2),
+    }
+
+
+def cost(row, price_in, price_cached, price_out):
+    uncached = row["input_tokens"] - row["cached_tokens"]
+    return round((uncached * price_in + row["cached_tokens"] * price_cached + row["output_tokens"] * price_out) / 1e6, 5)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=5)
+    parser.add_argument("--jobs", default=SAMPLE_JOBS)
+    parser.add_argument("--dry-run", action="store_true")
+    parser.add_argument("--price-in", type=float, default=0.15)
+    parser.add_argument("--price-cached", type=float, default=0.075)
+    parser.add_argument("--price-out", type=float, default=0.60)
+    args = parser.parse_args()
+
+    profile, jobs = load_inputs(args.jobs)
+    today = datetime.today().strftime("%B %d, %Y")
+    modes = {
+        "per-job": per_job_prompts(profile, jobs, today),
+        f"batch(k={args.batch_size})": batch_prompts(profile, jobs, today, args.batch_size),
+        "structured": structured_prompts(profile, jobs, today),
+    }
+
+    rows = {}
+    if args.dry_run:
+        encoding = tiktoken.get_encoding("o200k_base")
+        schema_tokens = len(encoding.encode(json.dumps(JobAnalysis.model_json_schema())))
+        for name, prompt_list in modes.items():
+            overhead = schema_tokens if name == "structured" else 0
+            prefix = len(encoding.encode(prompt_list[0][0].content)) + overhead
+            rows[name] = {
+                "requests": len(prompt_list),
+                "input_tokens": sum(sum(len(encoding.encode(m.content)) for m in p) + overhead for p in prompt_list),
+                "cached_tokens": prefix * (len(prompt_list) - 1) if prefix >= 1024 else 0,
+                "output_tokens": 0,
+                "seconds": 0.0,
+            }
+    else:
+        from langchain.chat_models import init_chat_model
+        model = init_chat_model(MODEL_NAME)
+        structured = model.with_structured_output(JobAnalysis, include_raw=True)
+        for name, prompt_list in modes.items():
+            rows[name] = asyncio.run(run_live(structured if name == "structured" else model, prompt_list))
+
+    print(f"{len(jobs)} jobs, model={MODEL_NAME}")
+    print(f"{'mode':<14}{'requests':>10}{'in tok':>10}{'cached':>10}{'out tok':>10}{'in/job':>10}{'out/job':>10}"
+          f"{'seconds':>10}{'cost $':>10}")
+    for name, row in rows.items():
+        print(f"{name:<14}{row['requests']:>10}{row['input_tokens']:>10}{row['cached_tokens']:>10}{row['output_tokens']:>10}"
+              f"{row['input_tokens'] // len(jobs):>10}{row['output_tokens'] // len(jobs):>10}"
+              f"{row['seconds']:>10}{cost(row, args.price_in, args.price_cached, args.price_out):>10}")
+
+
+if __name__ == "__main__":
+    main()
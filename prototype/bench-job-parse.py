@@ -0,0 +1,112 @@
+"""
+Measures job-description parse time per page for the previous parser (BeautifulSoup with
+html.parser), BeautifulSoup on lxml with a SoupStrainer, and the lxml XPath fallback chain
+used by linkedin_requests.
+
+    python prototype/bench-job-parse.py --pages 200
+    python prototype/bench-job-parse.py --html-dir saved_pages/      # real pages saved from LinkedIn
+"""
+import argparse
+import glob
+import os
+import random
+import sys
+import time
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from linkedin_agent.tools.linkedin_requests import _parse_job_description
+
+DESCRIPTION_CLASS = "description__text description__text--rich"
+
+
+def legacy_parse(html: str) -> str:
+    """The previous implementation, kept here as the baseline."""
+    soup = BeautifulSoup(html, 'html.parser')
+    return soup.find('div', class_=DESCRIPTION_CLASS).get_text()
+
+
+def strainer_parse(html: str) -> str:
+    # At parse time the strainer sees the raw class attribute, so it needs the full value
+    soup = BeautifulSoup(html, 'lxml', parse_only=SoupStrainer('div', class_=DESCRIPTION_CLASS))
+    return soup.find('div').get_text()
+
+
+def sample_page(rng: random.Random) -> str:
+    """A page shaped like a LinkedIn guest job page: heavy head, navigation, related jobs."""
+    scripts = "".join(
+        f"<script>window.__d{n} = {{a: {rng.random()}, b: '{'x' * rng.randint(500, 2000)}'}};</script>" for n in range(80)
+    )
+    styles = "".join(f"<style>.c{n} {{ color: #{n:06x}; margin: {n}px; }}</style>" for n in range(30))
+    nav = "".join(f"<li><a class='nav-link' href='/nav/{n}'>Item {n}</a></li>" for n in range(60))
+    paragraphs = "".join(
+        f"<p>Responsibility {n}: build <strong>LLM</strong> pipelines with Python, Azure and LangGraph; "
+        f"own monitoring &amp; evaluation.</p><ul><li>Skill {n}a</li><li>Skill {n}b</li></ul>"
+        for n in range(rng.randint(15, 40))
+    )
+    related = "".join(
+        f"<li class='job-card'><div class='base-card'><h3>Engineer {n}</h3><h4>Company {n}</h4>"
+        f"<span class='job-search-card__location'>City {n}</span><time>{n} days ago</time></div></li>"
+        for n in range(rng.randint(20, 50))
+    )
+    return (
+        f"<!DOCTYPE html><html lang='en'><head><meta charset='utf-8'><title>Job</title>{styles}{scripts}</head>"
+        f"<body><header><ul>{nav}</ul></header><main><section class='top-card'><h1>Senior AI Engineer</h1></section>"
+        f"<section class='description'><div class='{DESCRIPTION_CLASS}'>{paragraphs}</div></section>"
+        f"<section class='similar-jobs'><ul>{related}</ul></section></main><footer>{nav}</footer></body></html>"
+    )
+
+
+def load_pages(args) -> list:
+    if args.html_dir:
+        pages = []
+        for path in sorted(glob.glob(os.path.join(args.html_dir, "*.html"))):
+            with open(path, encoding="utf-8", errors="replace") as f:
+                pages.append(f.read())
+        return pages
+    rng = random.Random(7)
+    return [sample_page(rng) for _ in range(args.pages)]
+
+
+def bench(name: str, parse, pages: list, reference: list):
+    texts, failures = [], 0
+    started = time.perf_counter()
+    for page in pages:
+        try:
+            texts.append(parse(page))
+        except Exception:
+            texts.append(None)
+            failures += 1
+    elapsed = time.perf_counter() - started
+    # Compare whitespace-normalized text with the baseline's output
+    mismatches = sum(
+        1 for text, expected in zip(texts, reference)
+        if text is not None and expected is not None and text.split() != expected.split()
+    )
+    print(f"{name:<14}{elapsed * 1000 / len(pages):>10.2f}{len(pages) / elapsed:>10.0f}{failures:>10}{mismatches:>12}")
+
+
+def safe(parse, page):
+    try:
+        return parse(page)
+    except Exception:
+        return None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=200, help="synthetic pages to generate")
+    parser.add_argument("--html-dir", help="directory of saved job pages (*.html) to parse instead")
+    args = parser.parse_args()
+
+    pages = load_pages(args)
+    if not pages:
+        sys.exit("No pages to parse.")
+    reference = [safe(legacy_parse, page) for page in pages]
+    size = sum(len(page) for page in pages) / len(pages) / 1024
+    print(f"{len(pages)} pages, {size:.0f} KB average")
+    print(f"{'parser':<14}{'ms/page':>10}{'pages/s':>10}{'failures':>10}{'mismatches':>12}")
+    bench("html.parser", legacy_parse, pages, reference)
+    bench("bs4+strainer", strainer_parse, pages, reference)
+    bench("lxml xpath", _parse_job_description, pages, reference)
@@ -0,0 +1,118 @@
+"""
+Measures log throughput and event-loop stall time for the old synchronous
+INSERT+commit per call versus the buffered background writer.
+
+    python prototype/bench-mysql-logger.py --entries 2000                    # against the DB_* database
+    python prototype/bench-mysql-logger.py --entries 2000 --simulate-ms 2    # no database, fake 2 ms round trips
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from linkedin_agent.utils import mysql_logger
+
+
+class _FakeCursor:
+    def __init__(self, delay):
+        self.delay = delay
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, query, params=None):
+        time.sleep(self.delay)
+
+    def executemany(self, query, rows):
+        time.sleep(self.delay)
+
+
+class _FakeConnection(_FakeCursor):
+    def cursor(self):
+        return _FakeCursor(0)
+
+    def commit(self):
+        time.sleep(self.delay)
+
+
+class FakePool:
+    """Stands in for MySQLConnectionPool with a fixed round-trip delay."""
+
+    def __init__(self, delay_ms: float):
+        self.delay = delay_ms / 1000
+
+    def get_connection(self):
+        return _FakeConnection(self.delay)
+
+
+def sync_log(level, source, message, details=None):
+    """The previous implementation: one INSERT and commit per call."""
+    with mysql_logger._connection_pool.get_connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute(mysql_logger.INSERT_QUERY, (datetime.now(), mysql_logger.get_run_id(), level, source, message, json.dumps(details) if details else None))
+            conn.commit()
+
+
+async def measure(log_fn, entries: int) -> dict:
+    """Logs `entries` lines from a coroutine while a ticker measures event-loop lag."""
+    stalls = []
+    running = True
+
+    async def ticker():
+        interval = 0.005
+        while running:
+            started = time.perf_counter()
+            await asyncio.sleep(interval)
+            stalls.append(max(0.0, time.perf_counter() - started - interval))
+
+    tick = asyncio.create_task(ticker())
+    await asyncio.sleep(0.01)
+    started = time.perf_counter()
+    for i in range(entries):
+        log_fn('INFO', 'Benchmark', f'log line {i}', {'i': i})
+        if i % 50 == 0:
+            await asyncio.sleep(0)
+    call_seconds = time.perf_counter() - started
+    if log_fn is mysql_logger.log:
+        mysql_logger.flush_logs(timeout=120)
+    total_seconds = time.perf_counter() - started
+    running = False
+    await tick
+    return {
+        "logs_per_sec": round(entries / total_seconds),
+        "call_seconds": round(call_seconds, 3),
+        "max_stall_ms": round(max(stalls or [0]) * 1000, 1),
+        "total_stall_ms": round(sum(stalls) * 1000, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--entries", type=int, default=2000)
+    parser.add_argument("--simulate-ms", type=float, default=None, help="use a fake pool with this round-trip delay")
+    args = parser.parse_args()
+
+    if args.simulate_ms is not None:
+        mysql_logger._connection_pool = FakePool(args.simulate_ms)
+    else:
+        mysql_logger.init_db()
+        if not mysql_logger._connection_pool:
+            sys.exit("Database unavailable; use --simulate-ms.")
+
+    print(f"{'writer':<10}{'logs/s':>10}{'call s':>10}{'max stall ms':>14}{'total stall ms':>16}")
+    for name, fn in (("sync", sync_log), ("buffered", mysql_logger.log)):
+        row = asyncio.run(measure(fn, args.entries))
+        print(f"{name:<10}{row['logs_per_sec']:>10}{row['call_seconds']:>10}{row['max_stall_ms']:>14}{row['total_stall_ms']:>16}")
+    print(mysql_logger.get_logger_stats())
+    mysql_logger.shutdown_logger()
+
+
+if __name__ == "__main__":
+    main()
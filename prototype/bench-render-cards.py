@@ -0,0 +1,127 @@
+"""
+Measures parsing and card rendering throughput for the previous strict renderer
+(json.loads, format, += lists) versus the lenient parser and precompiled renderer,
+and how many realistic model outputs each one accepts.
+
+    python prototype/bench-render-cards.py --cards 5000
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from linkedin_agent.utils.render_html import JOB_CARD_TEMPLATE, render_job_card
+
+
+def legacy_render_job_card(analysis_json: str) -> str:
+    """The previous implementation, kept here as the baseline."""
+    try:
+        data = json.loads(analysis_json)
+    except json.JSONDecodeError:
+        return f"<div style='color: red;'>Error: Invalid JSON received from model.</div><pre>{analysis_json}</pre>"
+    fit_score = data.get("fitScore", 0)
+    if fit_score >= 90:
+        fit_details = {"emoji": "🌟", "word": "Excellent", "bg_color": "#e8eaf6", "text_color": "#3f51b5"}
+    elif 75 <= fit_score < 90:
+        fit_details = {"emoji": "✅", "word": "Strong", "bg_color": "#e8f5e9", "text_color": "#2e7d32"}
+    elif 60 <= fit_score < 75:
+        fit_details = {"emoji": "👍", "word": "Good", "bg_color": "#fff3e0", "text_color": "#f57c00"}
+    elif 40 <= fit_score < 60:
+        fit_details = {"emoji": "⚠️", "word": "Weak", "bg_color": "#ffecb3", "text_color": "#ff6f00"}
+    else:
+        fit_details = {"emoji": "❌", "word": "Poor", "bg_color": "#ffebee", "text_color": "#c62828"}
+    matching_skills_html = ""
+    for item in data.get("matchingSkills", []):
+        matching_skills_html += f"<li><strong>{item.get('skill', '')}:</strong> ({item.get('proficiency', '')}) {item.get('reason', '')}</li>"
+    if not matching_skills_html:
+        matching_skills_html = "<li>None specified.</li>"
+    missing_skills_html = ""
+    for item in data.get("missingSkills", []):
+        missing_skills_html += f"<li><strong>{item.get('skill', '')}:</strong> {item.get('reason', '')}</li>"
+    if not missing_skills_html:
+        missing_skills_html = "<li>None specified.</li>"
+    return JOB_CARD_TEMPLATE.format(
+        companyName=data.get("companyName", "Not specified"),
+        jobTitle=data.get("jobTitle", "Not specified"),
+        location=data.get("location", "Not specified"),
+        workType=data.get("workType", "Not specified"),
+        workTypeEmoji=data.get("workTypeEmoji", "❓"),
+        salary=data.get("salary", "Not specified"),
+        fit_bg_color=fit_details.get("bg_color"),
+        fit_text_color=fit_details.get("text_color"),
+        fit_emoji=fit_details.get("emoji"),
+        fit_word=fit_details.get("word"),
+        fit_score=fit_score,
+        fitReasoning=data.get("fitReasoning", ""),
+        matching_skills_list=matching_skills_html,
+        missing_skills_list=missing_skills_html,
+        notes=data.get("notes", ""),
+        companyDescription=data.get("companyDescription", ""),
+        linkedinUrl=data.get("linkedinUrl", "#")
+    )
+
+
+def sample_analysis(rng: random.Random) -> dict:
+    return {
+        "companyName": f"Company {rng.randint(1, 999)} & Partners",
+        "jobTitle": "Senior <AI> Engineer",
+        "location": "Berlin, Germany",
+        "workType": rng.choice(["Remote", "Hybrid", "Onsite"]),
+        "workTypeEmoji": "🏠",
+        "salary": "Not specified",
+        "fitScore": rng.randint(0, 100),
+        "fitReasoning": "Strong Python and LLM tooling background; " * 3,
+        "matchingSkills": [
+            {"skill": f"Skill {n}", "proficiency": "Expert", "reason": "Used daily in production systems."}
+            for n in range(rng.randint(3, 8))
+        ],
+        "missingSkills": [{"skill": f"Gap {n}", "reason": "Not in profile."} for n in range(rng.randint(0, 4))],
+        "notes": "Caution: This is a hybrid role and may require office presence.",
+        "companyDescription": "A company that builds things. " * 5,
+        "linkedinUrl": "https://www.linkedin.com/jobs/view/123456",
+    }
+
+
+def model_outputs(count: int, seed: int = 7) -> list:
+    """Well-formed JSON plus the wrappers models commonly add: fences, preambles, trailing notes."""
+    rng = random.Random(seed)
+    outputs = []
+    for n in range(count):
+        text = json.dumps(sample_analysis(rng), ensure_ascii=False, indent=2)
+        style = n % 4
+        if style == 1:
+            text = f"```json\n{text}\n```"
+        elif style == 2:
+            text = f"Here is the analysis:\n{text}"
+        elif style == 3:
+            text = f"{text}\n\nLet me know if you need anything else."
+        outputs.append(text)
+    return outputs
+
+
+def bench(name: str, render, outputs: list):
+    started = time.perf_counter()
+    cards = [render(output) for output in outputs]
+    elapsed = time.perf_counter() - started
+    errors = sum(1 for card in cards if "Error: Invalid JSON" in card)
+    print(f"{name:<12}{len(outputs) / elapsed:>12.0f}{elapsed * 1e6 / len(outputs):>12.1f}"
+          f"{len(outputs) - errors:>10}{errors:>10}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cards", type=int, default=5000)
+    args = parser.parse_args()
+
+    outputs = model_outputs(args.cards)
+    clean = [output for n, output in enumerate(outputs) if n % 4 == 0]
+    print(f"{'renderer':<12}{'cards/s':>12}{'us/card':>12}{'rendered':>10}{'errors':>10}")
+    print("-- well-formed outputs only --")
+    bench("legacy", legacy_render_job_card, clean)
+    bench("lenient", render_job_card, clean)
+    print("-- mixed outputs (fences, preambles, trailing text) --")
+    bench("legacy", legacy_render_job_card, outputs)
+    bench("lenient", render_job_card, outputs)
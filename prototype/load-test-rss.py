@@ -0,0 +1,72 @@
+"""
+Load-tests the /rss endpoint and reports requests per second and latency percentiles.
+
+    python rss_feed.py serve &                                            # or: python rss_feed.py dev
+    python prototype/load-test-rss.py --concurrency 50 --duration 15
+    python prototype/load-test-rss.py --conditional --encoding gzip       # feed readers revalidating with ETags
+"""
+import argparse
+import asyncio
+import time
+from collections import Counter
+
+import httpx
+
+
+def percentile(values: list, fraction: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+async def worker(client: httpx.AsyncClient, url: str, headers: dict, deadline: float, latencies: list, statuses: Counter):
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        try:
+            response = await client.get(url, headers=headers)
+            statuses[response.status_code] += 1
+            # Bytes on the wire, not after httpx's transparent decompression
+            statuses["bytes"] += int(response.headers.get("content-length", len(response.content)))
+        except httpx.HTTPError as e:
+            statuses[type(e).__name__] += 1
+            continue
+        latencies.append(time.perf_counter() - started)
+
+
+async def main(args):
+    headers = {"Accept-Encoding": args.encoding}
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(limits=limits, timeout=30) as client:
+        first = await client.get(args.url, headers=headers)
+        first.raise_for_status()
+        if args.conditional:
+            headers["If-None-Match"] = first.headers.get("etag", "")
+
+        latencies, statuses = [], Counter()
+        started = time.perf_counter()
+        deadline = started + args.duration
+        await asyncio.gather(*(
+            worker(client, args.url, headers, deadline, latencies, statuses) for _ in range(args.concurrency)
+        ))
+        elapsed = time.perf_counter() - started
+
+    body_bytes = statuses.pop("bytes", 0)
+    print(f"url={args.url} concurrency={args.concurrency} duration={elapsed:.1f}s "
+          f"encoding={args.encoding} conditional={args.conditional}")
+    print(f"{'requests':>10}{'rps':>10}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'max ms':>10}{'KB/req':>10}")
+    print(f"{len(latencies):>10}{len(latencies) / elapsed:>10.0f}"
+          f"{percentile(latencies, 0.5) * 1000:>10.1f}{percentile(latencies, 0.9) * 1000:>10.1f}"
+          f"{percentile(latencies, 0.99) * 1000:>10.1f}{max(latencies, default=0) * 1000:>10.1f}"
+          f"{body_bytes / max(len(latencies), 1) / 1024:>10.2f}")
+    print("responses:", dict(statuses))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:5000/rss")
+    parser.add_argument("--concurrency", type=int, default=20, help="concurrent connections")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds to run")
+    parser.add_argument("--encoding", default="identity", help="Accept-Encoding to send (identity, gzip, zstd)")
+    parser.add_argument("--conditional", action="store_true", help="send If-None-Match, as polling feed readers do")
+    asyncio.run(main(parser.parse_args()))
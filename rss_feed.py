@@ -1,116 +1,30 @@
-from flask import Flask, Response, send_from_directory
-from feedgen.feed import FeedGenerator
-import asyncio
+from flask import Flask, Response, request, send_from_directory
+import argparse
+import signal
 import sys
+import threading
 import os
-import random
-import uuid
-import json
-from datetime import datetime
-import pytz
-from apscheduler.schedulers.background import BackgroundScheduler
 
-from linkedin_agent.mcp_client_agent import run_agent, create_mcp_client
-from linkedin_agent.utils.mysql_logger import init_db, log, clear_logs
+from linkedin_agent.utils import feed_files, metrics
 
 app = Flask(__name__)
-RSS_FILE = "rss.xml"
+# How long feed readers and proxies may reuse a response before revalidating (seconds).
+FEED_CACHE_MAX_AGE = int(os.getenv("FEED_CACHE_MAX_AGE", "3600"))
 
+# --- Serving Configuration ---
+WEB_HOST = os.getenv("WEB_HOST", "0.0.0.0")
+WEB_PORT = int(os.getenv("WEB_PORT", "5000"))
+# Number of uvicorn processes in `serve` mode
+WEB_WORKERS = int(os.getenv("WEB_WORKERS", "4"))
+# "web" in `serve` processes, which only read what the agent worker publishes
+PROCESS_ROLE = os.getenv("FEED_PROCESS_ROLE", "all")
 
-async def pre_run_checks():
-    """
-    Performs pre-run checks for essential services like the database and MCP server.
-    Exits the application if a check fails.
-    """
-    print("--- Performing pre-run connectivity checks ---")
-    
-    # 1. Check SQL DB connection
-    try:
-        print("Checking database connection...")
-        init_db()  # This will implicitly check the connection by initializing
-        print("Database connection successful.")
-        log('INFO', 'PreRunCheck', 'Database connection successful.')
-    except Exception as e:
-        print(f"FATAL: Database connection failed: {e}", file=sys.stderr)
-        # We can't log to DB if it's down, so we just print and exit.
-        sys.exit(1)
+if PROCESS_ROLE == "web":
+    # uvicorn serves the Flask app through a2wsgi; its own WSGI interface is deprecated
+    from a2wsgi import WSGIMiddleware
 
-    # 2. Check MCP Server connection
-    try:
-        print("Checking MCP server connection...")
-        client = create_mcp_client()
-        await client.get_tools()  # This will fail if the server is unreachable
-        print("MCP server connection successful.")
-        log('INFO', 'PreRunCheck', 'MCP server connection successful.')
-    except Exception as e:
-        print(f"FATAL: MCP server connection failed: {e}", file=sys.stderr)
-        log('CRITICAL', 'PreRunCheck', 'MCP server connection failed.', {'error': str(e)})
-        sys.exit(1)
-        
-    print("--- All connectivity checks passed ---")
-
-
-def update_rss_feed():
-    """
-    Runs the agent, generates a new RSS feed, and saves it to a file.
-    """
-    print("--- Updating RSS Feed ---")
-    log('INFO', 'RSS_Feed', 'Starting RSS feed update.')
-    try:
-        # Run the agent to get the latest analysis
-        # We need to run the async function in a new event loop
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        analysis_content = loop.run_until_complete(run_agent())
-        loop.close()
-        log('INFO', 'RSS_Feed', 'Agent run completed.', {'content_length': len(analysis_content)})
-
-        # Create a new feed
-        fg = FeedGenerator()
-        fg.id('urn:uuid:' + str(uuid.uuid4()))
-        fg.title('LinkedIn Job Analysis RSS Feed')
-        fg.link(href='http://localhost:5000/rss', rel='self')
-        fg.description('An RSS feed of job analysis from the LinkedIn agent.')
-        fg.logo('http://localhost:5000/fluff/logo.png')
-
-        # Parse the JSON output from the agent and add an entry for each job
-        try:
-            jobs = json.loads(analysis_content)
-            
-            if not isinstance(jobs, list):
-                raise TypeError("Expected a list of jobs from agent")
-
-            for job in jobs:
-                fe = fg.add_entry()
-                fe.id('urn:uuid:' + str(uuid.uuid4()))
-                # Use .get() for safer dictionary access
-                job_title = job.get('job_title', 'Unknown Job Title')
-                job_html = job.get('job_html', '<p>No content available.</p>')
-                
-                fe.title(f"{job_title}")
-                fe.link(href='http://localhost:5000/rss')
-                fe.description(job_html)
-                fe.pubDate(datetime.now().replace(tzinfo=pytz.UTC))
-            log('INFO', 'RSS_Feed', 'Successfully parsed agent output and generated feed entries.')
-
-        except (json.JSONDecodeError, TypeError) as e:
-            log('ERROR', 'RSS_Feed', 'Error processing job analysis.', {'error': str(e), 'raw_output': analysis_content})
-            # If parsing fails or the structure is wrong, add a single error entry
-            fe = fg.add_entry()
-            fe.id('urn:uuid:' + str(uuid.uuid4()))
-            fe.title(f'Error Processing Job Analysis: {type(e).__name__}')
-            fe.link(href='http://localhost:5000/rss')
-            fe.description(f"Could not process agent output. Error: {e}\n\nRaw output:\n{analysis_content}")
-            fe.pubDate(datetime.now().replace(tzinfo=pytz.UTC))
-
-        # Save the feed to a file
-        fg.atom_file(RSS_FILE, pretty=True)
-        print(f"--- RSS Feed updated and saved to {RSS_FILE} ---")
-        log('INFO', 'RSS_Feed', f'RSS Feed updated and saved to {RSS_FILE}.')
-
-    except Exception as e:
-        print(f"Error updating RSS feed: {e}")
-        log('ERROR', 'RSS_Feed', 'Error updating RSS feed.', {'error': str(e)})
+# The agent, its SQLite caches, the background log writer and the scheduler loop live in
+# feed_worker, which only the `dev` and `worker` modes import, never the `serve` workers.
 
 
 @app.route('/fluff/<path:filename>')
@@ -120,40 +34,104 @@ def serve_fluff(filename):
 
 @app.route('/rss')
 def rss_feed():
-    """Serves the static RSS feed file."""
-    if not os.path.exists(RSS_FILE):
+    """
+    Serves the RSS feed from memory in the best encoding the client accepts, and
+    answers If-None-Match/If-Modified-Since with 304 when the feed has not changed.
+    """
+    feed = feed_files.load_feed(feed_files.RSS_FILE)
+    if feed is None:
         return "The RSS feed has not been generated yet. Please wait for the scheduled job to run.", 503
-    return send_from_directory('.', RSS_FILE, mimetype='application/atom+xml')
 
+    encoding = request.accept_encodings.best_match([e for e in ("zstd", "gzip") if e in feed.bodies]) or "identity"
+    response = Response(feed.bodies[encoding], mimetype='application/atom+xml')
+    if encoding != "identity":
+        response.content_encoding = encoding
+    response.vary.add('Accept-Encoding')
+    response.set_etag(feed.etag_for(encoding))
+    response.last_modified = feed.last_modified
+    response.cache_control.public = True
+    response.cache_control.max_age = FEED_CACHE_MAX_AGE
+    return response.make_conditional(request)
 
-if __name__ == '__main__':
-    # --- Perform pre-run checks first ---
-    # We need an event loop to run the async check function
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
-    loop.run_until_complete(pre_run_checks())
-    loop.close()
-    
-    # init_db() is now called inside pre_run_checks()
-
-    # --- Scheduler Setup ---
-    scheduler = BackgroundScheduler()
-    # Schedule the RSS feed update to run every 72 hours
-    scheduler.add_job(
-        update_rss_feed,
-        'interval',
-        hours=72,
-        jitter=36000
+
+@app.route('/metrics')
+def metrics_endpoint():
+    """Exposes agent, fetch, cache and logger metrics in the Prometheus text format."""
+    if PROCESS_ROLE == "web":
+        snapshot = metrics.read_snapshot(metrics.SNAPSHOT_PATH)
+        if snapshot is None:
+            return "No metrics published yet. Is the agent worker running?", 503
+        return Response(snapshot, content_type=metrics.CONTENT_TYPE)
+    return Response(metrics.render(), content_type=metrics.CONTENT_TYPE)
+
+
+if PROCESS_ROLE == "web":
+    asgi_app = WSGIMiddleware(app)
+
+
+def run_dev():
+    """Development mode: Flask's server and the scheduler share one process."""
+    from feed_worker import start_scheduler, stop_scheduler
+
+    scheduler = start_scheduler()
+    if scheduler is None:
+        sys.exit(1)
+    try:
+        app.run(debug=True, host=WEB_HOST, port=WEB_PORT, use_reloader=False) # use_reloader=False is important for scheduler
+    finally:
+        stop_scheduler(scheduler)
+
+
+def run_worker():
+    """
+    Production agent worker: runs the scheduler and the agent, and publishes the feed
+    and a metrics snapshot to disk. Run exactly one instance.
+    """
+    from feed_worker import start_scheduler, stop_scheduler
+
+    scheduler = start_scheduler(snapshot_metrics=True)
+    if scheduler is None:
+        sys.exit(1)
+    stopping = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stopping.set())
+    signal.signal(signal.SIGINT, lambda *_: stopping.set())
+    print("--- Agent worker running, press Ctrl+C to stop ---")
+    try:
+        while not stopping.wait(1):
+            pass
+    finally:
+        stop_scheduler(scheduler)
+        metrics.write_snapshot(metrics.SNAPSHOT_PATH)
+
+
+def run_server():
+    """
+    Production web server: WEB_WORKERS uvicorn processes serve /rss, /fluff and
+    /metrics from the files the agent worker publishes. No agent runs here.
+    """
+    import uvicorn
+
+    # Inherited by the uvicorn worker processes, which import this module fresh
+    # with only the web dependencies and expose the app as `asgi_app`
+    os.environ["FEED_PROCESS_ROLE"] = "web"
+    uvicorn.run(
+        "rss_feed:asgi_app",
+        host=WEB_HOST,
+        port=WEB_PORT,
+        workers=WEB_WORKERS,
+        access_log=False
     )
-    # Schedule the log cleanup to run once a week (e.g., every Sunday at midnight)
-    scheduler.add_job(
-        clear_logs,
-        'cron',
-        day_of_week='sun',
-        hour=0
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="LinkedIn job analysis RSS feed.")
+    parser.add_argument(
+        "mode",
+        nargs="?",
+        default="dev",
+        choices=["dev", "serve", "worker"],
+        help="dev: Flask server and scheduler in one process (default); "
+             "serve: multi-worker web server only; worker: scheduler and agent only"
     )
-    scheduler.start()
-    clear_logs()
-    update_rss_feed()  # Initial run to generate the feed immediately
-    # --- Start Flask App ---
-    app.run(debug=True, host='0.0.0.0', port=5000, use_reloader=False) # use_reloader=False is important for scheduler
+    args = parser.parse_args()
+    {"dev": run_dev, "serve": run_server, "worker": run_worker}[args.mode]()
@@ -0,0 +1,188 @@
+import json
+
+import pytest
+
+from linkedin_agent.utils.analysis_schema import (
+    JobAnalysis,
+    dump_analysis,
+    extract_json,
+    parse_analysis,
+    validate_analysis,
+)
+
+ANALYSIS = {
+    "companyName": "Contoso",
+    "jobTitle": "Senior AI Engineer",
+    "fitScore": 85,
+    "matchingSkills": [{"skill": "Python", "proficiency": "Expert", "reason": "Required"}],
+    "missingSkills": [{"skill": "Go", "reason": "Nice to have"}],
+}
+
+
+def analysis(**changes) -> dict:
+    return dict(ANALYSIS, **changes)
+
+
+# --- extract_json ---
+
+def test_extract_plain_json():
+    assert extract_json(json.dumps(ANALYSIS)) == ANALYSIS
+
+
+def test_extract_bytes():
+    assert extract_json(json.dumps(ANALYSIS).encode("utf-8")) == ANALYSIS
+
+
+@pytest.mark.parametrize("fence", ["```json", "```JSON", "```"])
+def test_extract_fenced_json(fence):
+    text = f"{fence}\n{json.dumps(ANALYSIS, indent=2)}\n```"
+    assert extract_json(text) == ANALYSIS
+
+
+def test_extract_with_preamble_and_trailing_text():
+    text = f"Here is the analysis you asked for:\n{json.dumps(ANALYSIS)}\nLet me know if you need more."
+    assert extract_json(text) == ANALYSIS
+
+
+def test_extract_skips_brackets_in_preamble():
+    text = f"Notes [draft] and {{braces}} first, then {json.dumps(ANALYSIS)}"
+    assert extract_json(text) == ANALYSIS
+
+
+def test_extract_broken_fence_falls_back_to_its_content():
+    text = f"```json\nAnswer: {json.dumps(ANALYSIS)} (final)\n```"
+    assert extract_json(text) == ANALYSIS
+
+
+def test_extract_array():
+    assert extract_json(f"Results:\n[{json.dumps(ANALYSIS)}]") == [ANALYSIS]
+
+
+@pytest.mark.parametrize("text", [None, 42, "", "no json here", "{not json", '{"companyName": '])
+def test_extract_returns_none_without_json(text):
+    assert extract_json(text) is None
+
+
+# --- JobAnalysis.fitScore ---
+
+@pytest.mark.parametrize("value, expected", [
+    (85, 85),
+    (84.6, 85),
+    ("85", 85),
+    ("85%", 85),
+    (" 72.4 % ", 72),
+    (150, 100),
+    (-5, 0),
+    ("1e3", 100),
+])
+def test_score_is_coerced_and_clamped(value, expected):
+    assert JobAnalysis.model_validate(analysis(fitScore=value)).fitScore == expected
+
+
+@pytest.mark.parametrize("value", [
+    None,
+    [85],
+    {"score": 85},
+    True,
+    "high",
+    "",
+    float("inf"),
+    float("-inf"),
+    float("nan"),
+    "inf",
+    "1e400",
+    10 ** 400,
+])
+def test_invalid_score_fails_validation(value):
+    assert validate_analysis(analysis(fitScore=value)) is None
+
+
+def test_missing_score_fails_validation():
+    data = analysis()
+    del data["fitScore"]
+    assert validate_analysis(data) is None
+
+
+# --- Skills and optional fields ---
+
+def test_bare_skill_names_become_objects():
+    result = validate_analysis(analysis(matchingSkills=["Python", "Azure"], missingSkills=["Go"]))
+    assert [skill.skill for skill in result.matchingSkills] == ["Python", "Azure"]
+    assert result.matchingSkills[0].proficiency == ""
+    assert [skill.skill for skill in result.missingSkills] == ["Go"]
+
+
+def test_mixed_skill_items():
+    result = validate_analysis(analysis(matchingSkills=["Python", {"skill": "Azure", "proficiency": "Expert"}]))
+    assert [(s.skill, s.proficiency) for s in result.matchingSkills] == [("Python", ""), ("Azure", "Expert")]
+
+
+@pytest.mark.parametrize("field", ["matchingSkills", "missingSkills"])
+def test_missing_skill_list_defaults_to_empty(field):
+    data = analysis()
+    del data[field]
+    assert getattr(validate_analysis(data), field) == []
+
+
+@pytest.mark.parametrize("field", ["matchingSkills", "missingSkills"])
+def test_null_skill_list_becomes_empty(field):
+    assert getattr(validate_analysis(analysis(**{field: None})), field) == []
+
+
+def test_only_score_is_required():
+    result = validate_analysis({"fitScore": 60})
+    assert (result.companyName, result.jobTitle) == ("Not specified", "Not specified")
+    assert result.matchingSkills == [] and result.missingSkills == []
+
+
+def test_null_names_fall_back_to_not_specified():
+    result = validate_analysis(analysis(companyName=None, jobTitle=None))
+    assert (result.companyName, result.jobTitle) == ("Not specified", "Not specified")
+
+
+def test_numeric_text_fields_are_kept_as_text():
+    result = parse_analysis(json.dumps(analysis(salary=120000, location=10115, jobTitle=42, notes=1.5)))
+    assert (result.salary, result.location, result.jobTitle, result.notes) == ("120000", "10115", "42", "1.5")
+
+
+def test_non_scalar_text_field_fails_validation():
+    assert validate_analysis(analysis(salary={"min": 1, "max": 2})) is None
+
+
+def test_skill_without_name_fails_validation():
+    assert validate_analysis(analysis(matchingSkills=[{"proficiency": "Expert"}])) is None
+
+
+def test_optional_fields_default_and_extra_fields_are_ignored():
+    result = validate_analysis(analysis(location=None, unexpected="ignored"))
+    assert result.location is None
+    assert result.workType == "Not specified"
+    assert "unexpected" not in result.model_dump()
+
+
+def test_validate_rejects_non_objects():
+    assert validate_analysis([ANALYSIS]) is None
+    assert validate_analysis("text") is None
+
+
+# --- parse_analysis / dump_analysis ---
+
+def test_parse_fenced_answer_with_lenient_fields():
+    text = "Sure!\n```json\n" + json.dumps(analysis(fitScore="90%", missingSkills=["Go"])) + "\n```"
+    result = parse_analysis(text)
+    assert result.fitScore == 90
+    assert result.missingSkills[0].skill == "Go"
+
+
+def test_parse_returns_none_for_invalid_score():
+    assert parse_analysis(json.dumps(analysis(fitScore=None))) is None
+
+
+def test_parse_passes_through_validated_analysis():
+    result = JobAnalysis.model_validate(ANALYSIS)
+    assert parse_analysis(result) is result
+
+
+def test_dump_round_trips():
+    result = JobAnalysis.model_validate(ANALYSIS)
+    assert parse_analysis(dump_analysis(result)) == result